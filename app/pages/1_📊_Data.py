@@ -4,12 +4,12 @@ from pathlib import Path
 
 from utils.common import (
     resolve_csv_path,
-    load_time_indexed_data,
     list_distinct_month_strings_from_index,
     list_numeric_columns,
     prettify_column_name,
     make_unique,
 )
+from utils.shared_store import load_shared_time_indexed_data
 
 # ---------------- PAGE CONFIGURATION ----------------
 st.set_page_config(page_title="Data", layout="wide")
@@ -28,8 +28,8 @@ def main():
     project_root = Path(__file__).resolve().parents[1]
     csv_file_path = resolve_csv_path(project_root)
 
-    # Load the time-indexed dataset (cached for faster reloads)
-    time_indexed_data = load_time_indexed_data(csv_file_path)
+    # Load the time-indexed dataset (one read-only copy shared by all sessions)
+    time_indexed_data = load_shared_time_indexed_data(csv_file_path)
 
     # Display basic dataset info
     st.caption(f"Rows: {time_indexed_data.shape[0]:,}  |  Columns: {time_indexed_data.shape[1]:,}")
@@ -1,22 +1,46 @@
 import streamlit as st
 from pathlib import Path
-from plotly.subplots import make_subplots
-import plotly.graph_objects as go
 
 from utils.common import (
     resolve_csv_path,
-    load_time_indexed_data,
     list_distinct_month_strings_from_index,
     filter_by_month_range,
+    month_range_bounds,
     list_numeric_columns,
     build_pretty_name_mappings,
     plot_single_series_matplotlib,
 )
+from utils.shared_store import load_shared_time_indexed_data
+from utils.prefetch import get_view_prefetcher, session_owner
+from utils.plotly_payload import build_multi_series_figure, payload_size_bytes
+from utils.resampling import (
+    RESOLUTIONS,
+    STATISTICS,
+    get_resolution_pyramid,
+    resample_from_pyramid,
+    slice_to_span,
+    choose_resolution,
+)
 
 # ---------------- PAGE CONFIGURATION ----------------
 st.set_page_config(page_title="Charts", layout="wide")
 
 
+def build_chart_data(time_indexed_data, start_month, end_month, resolution_choice, statistic):
+    """Filter to the month range and apply the chosen (or automatic) resolution."""
+    filtered_data = filter_by_month_range(time_indexed_data, start_month, end_month)
+    resolution = choose_resolution(*month_range_bounds(start_month, end_month))
+    if resolution_choice != "auto":
+        resolution = resolution_choice
+
+    # Hourly data is the raw frame; coarser levels come from the cached pyramid
+    if resolution != "hourly" and not filtered_data.empty:
+        pyramid = get_resolution_pyramid(time_indexed_data)
+        resampled = resample_from_pyramid(pyramid, resolution, statistic)
+        filtered_data = slice_to_span(resampled, filtered_data.index.min(), filtered_data.index.max())
+    return filtered_data, resolution
+
+
 def main():
     # ---------------- PAGE HEADER ----------------
     st.title("Charts")
@@ -27,8 +51,8 @@ def main():
     project_root = Path(__file__).resolve().parents[1]
     csv_file_path = resolve_csv_path(project_root)
 
-    # Load data (cached for performance)
-    time_indexed_data = load_time_indexed_data(csv_file_path)
+    # Load data (one read-only copy shared by all sessions)
+    time_indexed_data = load_shared_time_indexed_data(csv_file_path)
 
     # ---------------- MONTH SELECTION ----------------
     # Extract month strings from time index for slider control
@@ -46,8 +70,50 @@ def main():
         help="Defaults to the first month."
     )
 
-    # Filter the data according to selected months
-    filtered_data = filter_by_month_range(time_indexed_data, start_month, end_month)
+    # ---------------- RESOLUTION SELECTION ----------------
+    # Long ranges are plotted from precomputed daily / weekly / monthly aggregates
+    auto_resolution = choose_resolution(*month_range_bounds(start_month, end_month))
+    res_col, stat_col = st.columns(2)
+    with res_col:
+        resolution_choice = st.selectbox(
+            "Resolution",
+            options=["auto"] + RESOLUTIONS,
+            index=0,
+            format_func=lambda r: f"Auto ({auto_resolution})" if r == "auto" else r.capitalize(),
+            help="Auto picks a resolution from the selected span.",
+        )
+    with stat_col:
+        statistic = st.selectbox(
+            "Aggregate",
+            options=STATISTICS,
+            index=0,
+            format_func=lambda s: "Auto (per variable)" if s == "auto" else s.capitalize(),
+            help="Auto: sum for precipitation, max for gusts, circular mean for wind direction, mean otherwise.",
+        )
+
+    # Filter + resample the selected months (served from the prefetch cache when available)
+    prefetcher = get_view_prefetcher("charts")
+    filtered_data, resolution = prefetcher.get(
+        (start_month, end_month, resolution_choice, statistic),
+        lambda: build_chart_data(time_indexed_data, start_month, end_month, resolution_choice, statistic),
+    )
+
+    # Prefetch the same-width range one month earlier and one month later
+    start_pos, end_pos = months.index(start_month), months.index(end_month)
+    next_views = {}
+    for step in (-1, 1):
+        if 0 <= start_pos + step and end_pos + step < len(months):
+            next_start, next_end = months[start_pos + step], months[end_pos + step]
+            next_views[(next_start, next_end, resolution_choice, statistic)] = (
+                lambda s=next_start, e=next_end: build_chart_data(
+                    time_indexed_data, s, e, resolution_choice, statistic
+                )
+            )
+    prefetcher.prefetch(next_views, owner=session_owner())
+
+    if filtered_data.empty:
+        st.warning("No data in this month range.")
+        return
 
     # ---------------- COLUMN SELECTION ----------------
     # Keep only numeric columns for plotting
@@ -69,7 +135,7 @@ def main():
     # Display dataset info
     st.caption(
         f"Rows: {filtered_data.shape[0]:,}  |  Cols: {filtered_data.shape[1]:,}  "
-        f"|  Months: {start_month} → {end_month}"
+        f"|  Months: {start_month} → {end_month}  |  Resolution: {resolution}"
     )
 
     # ---------------- SINGLE COLUMN PLOT ----------------
@@ -96,28 +162,8 @@ def main():
     primary_cols = [c for c in numeric_cols if not (secondary_cols and c in secondary_cols)]
 
     # ---------------- BUILD PLOTLY CHART ----------------
-    fig = make_subplots(specs=[[{"secondary_y": True}]])
-
-    # Primary Y-axis traces (left side)
-    for c in primary_cols:
-        fig.add_trace(
-            go.Scatter(x=filtered_data.index, y=filtered_data[c], name=c, mode="lines"),
-            secondary_y=False
-        )
-
-    # Secondary Y-axis traces (right side)
-    if secondary_cols:
-        for c in secondary_cols:
-            fig.add_trace(
-                go.Scatter(
-                    x=filtered_data.index,
-                    y=filtered_data[c],
-                    name=c,
-                    mode="lines",
-                    line=dict(dash="dash")
-                ),
-                secondary_y=True
-            )
+    # Shared x axis (x0 + dx) and typed float32 y arrays keep the payload small
+    fig = build_multi_series_figure(filtered_data, primary_cols, secondary_cols)
 
     # ---------------- LAYOUT AND STYLE ----------------
     fig.update_layout(
@@ -138,6 +184,7 @@ def main():
 
     # Display interactive Plotly chart
     st.plotly_chart(fig, use_container_width=True)
+    st.caption(f"Chart payload: {payload_size_bytes(fig) / 1024:,.0f} KB")
 
 
 if __name__ == "__main__":
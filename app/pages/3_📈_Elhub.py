@@ -1,8 +1,18 @@
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
 from pymongo import MongoClient
 
+from utils.shared_store import share_frame
+from utils.prefetch import get_view_prefetcher, session_owner
+from utils.production_cube import ProductionCube
+from utils.elhub import (
+    DEFAULT_YEAR,
+    clean_production_frame,
+    plot_production_pie,
+    plot_hourly_production,
+    render_figure,
+)
+
 # -------------------------------------------------
 # Streamlit page config
 # -------------------------------------------------
@@ -20,11 +30,12 @@ st.caption(
 # Load data from MongoDB Atlas
 # -------------------------------------------------
 
-@st.cache_data(show_spinner=False)
+@st.cache_resource(show_spinner=False)
 def load_data_from_mongo() -> pd.DataFrame:
     """
     Connects to MongoDB Atlas using secrets, pulls the whole collection,
     and returns a cleaned pandas DataFrame ready for plotting.
+    The frame is read-only and shared by all sessions: never modify it in place.
     """
 
     # read credentials from Streamlit secrets
@@ -39,26 +50,41 @@ def load_data_from_mongo() -> pd.DataFrame:
     docs = list(coll.find({}, {"_id": 0}))  # drop MongoDB internal _id
     client.close()
 
-    df = pd.DataFrame(docs)
+    # parse, clean and restrict to year 2021 (the scope of the dashboard)
+    df = clean_production_frame(pd.DataFrame(docs), year=2021)
 
-    # parse timestamps + numeric
-    df["start_time"] = pd.to_datetime(df["start_time"], errors="coerce", utc=True)
-    df["quantity_kwh"] = pd.to_numeric(df["quantity_kwh"], errors="coerce")
+    return share_frame(df, "elhub_production_2021")
 
-    # drop rows missing the essentials
-    df = df.dropna(subset=["start_time", "quantity_kwh"])
 
-    # helper cols
-    df["year"] = df["start_time"].dt.year
-    df["month"] = df["start_time"].dt.month
-
-    return df
+@st.cache_resource(show_spinner=False)
+def load_production_cube() -> ProductionCube:
+    """
+    The same rows as a dense [price_area, production_group, hour] array,
+    built once and shared by all sessions: every view below is a slice.
+    """
+    return ProductionCube.from_frame(load_data_from_mongo())
 
 
 df_all = load_data_from_mongo()
+cube = load_production_cube()
 
-# restrict to year 2021 only (the scope of the dashboard)
-df_all = df_all[df_all["year"] == 2021].copy()
+
+# -------------------------------------------------
+# Views (cube slice + plot → PNG), safe to build in background threads
+# -------------------------------------------------
+def render_pie_view(area: str) -> bytes:
+    pie_df = cube.totals_by_group(area, DEFAULT_YEAR)
+    return render_figure(plot_production_pie(pie_df, area))
+
+
+def render_line_view(area: str, month: int, groups: tuple[str, ...]) -> bytes | None:
+    pivot = cube.hourly(area, DEFAULT_YEAR, month, list(groups))
+    if pivot.empty:
+        return None
+    return render_figure(plot_hourly_production(pivot, area, month))
+
+
+prefetcher = get_view_prefetcher("elhub")
 
 # -------------------------------------------------
 # Quick preview of the raw data
@@ -81,51 +107,16 @@ with left_col:
     st.markdown("#### Total production share by source")
 
     # radio buttons for price area
-    areas = sorted(df_all["price_area"].unique().tolist())
+    areas = cube.areas
     selected_area = st.radio(
         "Select a price area:",
         areas,
         horizontal=True,
     )
 
-    # filter data for this area for full 2021
-    df_area = df_all[df_all["price_area"] == selected_area].copy()
-
-    # aggregate total energy by production group
-    pie_df = (
-        df_area
-        .groupby("production_group")["quantity_kwh"]
-        .sum()
-        .sort_values(ascending=False)
-        .reset_index()
-    )
-
-    # build pie chart
-    fig_pie, ax_pie = plt.subplots(figsize=(4, 4))
-    wedges, _texts = ax_pie.pie(
-        pie_df["quantity_kwh"],
-        startangle=90,
-        wedgeprops={"linewidth": 0.5, "edgecolor": "white"},
-    )
-    ax_pie.set_title(f"Total production by source\n{selected_area}, 2021")
-
-    # legend with percentages (instead of putting % on the pie)
-    total_val = pie_df["quantity_kwh"].sum()
-    legend_labels = []
-    for group_name, val in zip(pie_df["production_group"], pie_df["quantity_kwh"]):
-        pct = 100.0 * val / total_val if total_val > 0 else 0.0
-        legend_labels.append(f"{group_name} — {pct:.1f}%")
-
-    ax_pie.legend(
-        wedges,
-        legend_labels,
-        title="production_group",
-        loc="center left",
-        bbox_to_anchor=(1, 0.5),
-    )
-
-    st.pyplot(fig_pie)
-    plt.close(fig_pie)
+    # aggregate + plot (served from the prefetch cache when available)
+    pie_png = prefetcher.get(("pie", selected_area), lambda: render_pie_view(selected_area))
+    st.image(pie_png, use_container_width=True)
 
 # ============================
 # RIGHT COLUMN → line chart
@@ -134,7 +125,7 @@ with right_col:
     st.markdown("#### Hourly production (line chart)")
 
     # multiselect ~ "pills" for production group
-    all_groups = sorted(df_all["production_group"].unique().tolist())
+    all_groups = cube.groups
     chosen_groups = st.multiselect(
         "Select production group(s):",
         options=all_groups,
@@ -151,50 +142,33 @@ with right_col:
         index=0,  # default January
     )
 
-    # slice data for that area + month + selected groups
-    df_line_src = df_all[
-        (df_all["price_area"] == selected_area)
-        & (df_all["month"] == chosen_month)
-        & (df_all["production_group"].isin(chosen_groups))
-    ].copy()
+    # cube slice + plot for that area + month + selected groups
+    groups_key = tuple(sorted(chosen_groups))
+    line_png = prefetcher.get(
+        ("line", selected_area, chosen_month, groups_key),
+        lambda: render_line_view(selected_area, chosen_month, groups_key),
+    )
 
-    if df_line_src.empty:
+    if line_png is None:
         st.info("No data for that area / month / group selection.")
     else:
-        # pivot: each production_group becomes its own time series
-        df_line_pivot = (
-            df_line_src
-            .groupby(["start_time", "production_group"])["quantity_kwh"]
-            .sum()
-            .reset_index()
-            .pivot(
-                index="start_time",
-                columns="production_group",
-                values="quantity_kwh",
-            )
-            .sort_index()
-        )
+        st.image(line_png, use_container_width=True)
 
-        # plot with matplotlib
-        fig_line, ax_line = plt.subplots(figsize=(6, 3))
-
-        df_line_pivot.plot(ax=ax_line, linewidth=1.2)
-
-        ax_line.set_title(
-            f"Hourly production in {selected_area} ({chosen_month:02d}/2021)"
-        )
-        ax_line.set_ylabel("kWh")
-        ax_line.set_xlabel("Time (UTC)")
-
-        ax_line.legend(
-            title="production_group",
-            fontsize="small",
-            ncol=2,
-            loc="upper right",
+# -------------------------------------------------
+# Speculative prefetch of the likely next views
+# -------------------------------------------------
+# other price areas' pies, and the previous / next month of the line chart
+next_views = {
+    ("pie", area): (lambda area=area: render_pie_view(area))
+    for area in areas
+    if area != selected_area
+}
+for month in (chosen_month - 1, chosen_month + 1):
+    if month in month_options:
+        next_views[("line", selected_area, month, groups_key)] = (
+            lambda month=month: render_line_view(selected_area, month, groups_key)
         )
-
-        st.pyplot(fig_line)
-        plt.close(fig_line)
+prefetcher.prefetch(next_views, owner=session_owner())
 
 # -------------------------------------------------
 # Documentation 
@@ -0,0 +1,220 @@
+# tools/elhub_stub_server.py
+"""
+Local stand-in for api.elhub.no, to exercise the ingestion code offline.
+
+Serves GET /energy-data/v0/price-areas/<AREA>?dataset=...&startDate=...
+&endDate=...&productionGroup=... with deterministic hourly data in the
+Elhub JSON shape, an ETag per response (If-None-Match → 304), an
+optional number of initial 503 responses to exercise the retry path, and
+production groups that answer with no data or without their last day (not
+yet published). Hours follow Norwegian local time, like Elhub.
+
+Run from the app/ folder:
+    python -m tools.elhub_stub_server --port 8765        # serve until Ctrl+C
+    python -m tools.elhub_stub_server --self-check       # cache / retry / parsing checks
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import tempfile
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+API_PREFIX = "/energy-data/v0/price-areas/"
+
+
+def build_payload(area: str, group: str, start_date: str, end_date: str) -> dict:
+    """Deterministic hourly production in the Elhub response format."""
+    hours = pd.date_range(
+        pd.Timestamp(start_date, tz="Europe/Oslo"),
+        pd.Timestamp(end_date, tz="Europe/Oslo") + pd.Timedelta(days=1),
+        freq="h",
+        inclusive="left",
+    )
+    seed = int(hashlib.sha256(f"{area}{group}".encode()).hexdigest()[:6], 16) % 1000
+    items = [
+        {
+            "priceArea": area,
+            "productionGroup": group,
+            "startTime": ts.isoformat(),
+            "quantityKwh": float(seed * 100 + ts.hour * 10 + ts.day),
+        }
+        for ts in hours
+    ]
+    return {"data": [{"attributes": {"productionPerGroupMbaHour": items}}]}
+
+
+class StubState:
+    """Counters and failure injection shared by the request handlers."""
+
+    def __init__(
+        self,
+        fail_first: int = 0,
+        empty_groups: set[str] | None = None,
+        partial_groups: set[str] | None = None,
+    ):
+        self.fail_first = fail_first
+        self.empty_groups = set(empty_groups or ())
+        self.partial_groups = set(partial_groups or ())
+        self.requests = 0
+        self.not_modified = 0
+        self.lock = threading.Lock()
+
+
+def _make_handler(state: StubState):
+    class ElhubStubHandler(BaseHTTPRequestHandler):
+        def log_message(self, *args):  # keep test output quiet
+            pass
+
+        def _send(self, status: int, body: bytes = b"", headers: dict | None = None):
+            self.send_response(status)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            with state.lock:
+                state.requests += 1
+                failing = state.fail_first > 0
+                if failing:
+                    state.fail_first -= 1
+            if failing:
+                self._send(503, headers={"Retry-After": "0"})
+                return
+
+            url = urlparse(self.path)
+            if not url.path.startswith(API_PREFIX):
+                self._send(404)
+                return
+            area = url.path[len(API_PREFIX):]
+            query = {k: v[0] for k, v in parse_qs(url.query).items()}
+            group = query.get("productionGroup", "")
+            if group in state.empty_groups:
+                payload = {"data": []}
+            else:
+                payload = build_payload(area, group, query["startDate"], query["endDate"])
+                if group in state.partial_groups:
+                    items = payload["data"][0]["attributes"]["productionPerGroupMbaHour"]
+                    del items[-24:]
+            body = json.dumps(payload).encode("utf-8")
+            etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+
+            if self.headers.get("If-None-Match") == etag:
+                with state.lock:
+                    state.not_modified += 1
+                self._send(304, headers={"ETag": etag})
+                return
+            self._send(200, body, {"Content-Type": "application/json", "ETag": etag})
+
+    return ElhubStubHandler
+
+
+@contextmanager
+def run_stub_server(
+    port: int = 0,
+    fail_first: int = 0,
+    empty_groups: set[str] | None = None,
+    partial_groups: set[str] | None = None,
+):
+    """Start the stub in a background thread; yields (api_base URL, StubState)."""
+    state = StubState(fail_first=fail_first, empty_groups=empty_groups, partial_groups=partial_groups)
+    server = ThreadingHTTPServer(("127.0.0.1", port), _make_handler(state))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        host, bound_port = server.server_address[:2]
+        yield f"http://{host}:{bound_port}{API_PREFIX.rstrip('/')}", state
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _check(condition: bool, message: str) -> None:
+    """Fail the self-check (exit status 1); unlike assert, also runs under python -O."""
+    if not condition:
+        raise SystemExit(f"elhub stub self-check failed: {message}")
+
+
+def self_check() -> None:
+    """Run the cache, revalidation, retry and parsing paths against the stub."""
+    import requests
+
+    from utils.elhub_api import ResponseCache, fetch_month_one_group
+
+    with tempfile.TemporaryDirectory() as tmp, \
+            run_stub_server(fail_first=2, empty_groups={"solar"}, partial_groups={"thermal"}) as (api_base, state):
+        cache = ResponseCache(Path(tmp))
+        session = requests.Session()
+        today = pd.Timestamp("2021-06-15", tz="UTC")
+
+        # retry: two 503s, then a 200; parsing: one row per hour of March (local time, DST: 743)
+        df = fetch_month_one_group("NO1", "2021-03", "hydro", cache, session, api_base, today=today)
+        _check(state.requests == 3, f"expected 3 requests after two retries, got {state.requests}")
+        _check(len(df) == 31 * 24 - 1, f"expected {31 * 24 - 1} hourly rows, got {len(df)}")
+        _check(list(df.columns) == ["price_area", "production_group", "start_time", "quantity_kwh"],
+               f"unexpected columns {list(df.columns)}")
+        _check(str(df["start_time"].dt.tz) == "UTC", "start_time is not UTC")
+
+        # closed month: served from disk, no request at all
+        again = fetch_month_one_group("NO1", "2021-03", "hydro", cache, session, api_base, today=today)
+        _check(state.requests == 3, "closed month was requested again")
+        _check(again.equals(df), "cached closed month differs from the first response")
+
+        # current month: conditional request, answered with 304
+        fetch_month_one_group("NO1", "2021-06", "wind", cache, session, api_base, today=today)
+        fetch_month_one_group("NO1", "2021-06", "wind", cache, session, api_base, today=today)
+        _check(state.requests == 5, f"expected 5 requests after revalidation, got {state.requests}")
+        _check(state.not_modified == 1, f"expected one 304, got {state.not_modified}")
+
+        # empty closed month: not frozen in the cache, asked again (answered with 304)
+        empty = fetch_month_one_group("NO1", "2021-03", "solar", cache, session, api_base, today=today)
+        fetch_month_one_group("NO1", "2021-03", "solar", cache, session, api_base, today=today)
+        _check(empty.empty, "empty response did not give an empty frame")
+        _check(state.requests == 7, "empty closed month was cached as final")
+        _check(state.not_modified == 2, "empty closed month was not revalidated")
+
+        # closed month missing its last day: revalidated, not frozen with a gap
+        fetch_month_one_group("NO1", "2021-03", "thermal", cache, session, api_base, today=today)
+        fetch_month_one_group("NO1", "2021-03", "thermal", cache, session, api_base, today=today)
+        _check(state.requests == 9, "partial closed month was cached as final")
+
+        # complete month inside the publication grace period: still revalidated
+        just_after = pd.Timestamp("2021-04-02", tz="UTC")
+        fetch_month_one_group("NO1", "2021-03", "wind", cache, session, api_base, today=just_after)
+        fetch_month_one_group("NO1", "2021-03", "wind", cache, session, api_base, today=just_after)
+        _check(state.requests == 11, "month within the grace period was cached as final")
+        session.close()
+
+    print("elhub stub self-check passed")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fail-first", type=int, default=0, help="answer the first N requests with 503")
+    parser.add_argument("--self-check", action="store_true")
+    args = parser.parse_args()
+
+    if args.self_check:
+        self_check()
+        return
+
+    with run_stub_server(args.port, args.fail_first) as (api_base, _state):
+        print(f"Elhub stub serving on {api_base} (Ctrl+C to stop)")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+# tools/load_test.py
+"""
+Concurrent-session load test for the dashboard pages.
+
+Each simulated session is a Streamlit AppTest running a scripted sequence
+of interactions on one page (first load, then widget changes, each one a
+rerun). N sessions run concurrently on threads, as in the Streamlit server,
+and share the process-wide caches (st.cache_resource, shared store).
+
+MongoDB is a stand-in seeded with a synthetic full-year Elhub collection
+(in-memory by default, or mongomock), or a real server such as a local
+mongod (--backend mongod --mongo-uri ...; --seed fills it first).
+
+Reports p50 / p95 / p99 rerun latency per page, reruns per second, peak RSS
+and the number of sessions that failed. Each (page, sessions) scenario runs
+in a fresh process, so its peak RSS is its own and not that of an earlier,
+larger scenario.
+
+Run from the app/ folder:
+    python -m tools.load_test --sessions 1 10 50
+    python -m tools.load_test --sessions 20 --pages elhub --backend mongod --mongo-uri mongodb://localhost:27017 --seed
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+from tools.measure_shared_memory import PRICE_AREAS, synthetic_production
+
+APP_ROOT = Path(__file__).resolve().parents[1]
+MONGO_DB = "ind320"
+MONGO_COLLECTION = "elhub_production_2021"
+PAGES = {
+    "data": "pages/1_📊_Data.py",
+    "charts": "pages/2_📈_Charts.py",
+    "elhub": "pages/3_📈_Elhub.py",
+}
+
+
+# ---------------- MONGO STAND-IN ----------------
+def synthetic_documents() -> list[dict]:
+    """Elhub rows as stored in MongoDB (no helper columns)."""
+    df = synthetic_production().drop(columns=["year", "month"])
+    return [
+        {"price_area": a, "production_group": g, "start_time": t, "quantity_kwh": q}
+        for a, g, t, q in zip(
+            df["price_area"].tolist(),
+            df["production_group"].tolist(),
+            df["start_time"].dt.to_pydatetime().tolist(),
+            df["quantity_kwh"].tolist(),
+        )
+    ]
+
+
+class InMemoryCollection:
+    """The part of a pymongo collection the pages use: find({}, projection)."""
+
+    def __init__(self):
+        self.documents: list[dict] = []
+
+    def insert_many(self, documents: list[dict]) -> None:
+        self.documents.extend(dict(doc) for doc in documents)
+
+    def find(self, filter: dict | None = None, projection: dict | None = None):
+        if filter:
+            raise ValueError("InMemoryCollection only supports find({}) without a filter.")
+        hidden = {k for k, v in (projection or {}).items() if not v}
+        return (
+            {k: v for k, v in doc.items() if k not in hidden}
+            for doc in self.documents
+        )
+
+
+class InMemoryMongoClient:
+    """client[db][collection] → one shared InMemoryCollection per name."""
+
+    def __init__(self):
+        self._collections: dict[tuple[str, str], InMemoryCollection] = {}
+
+    def __getitem__(self, db_name: str):
+        client = self
+
+        class _Database:
+            def __getitem__(self, coll_name: str) -> InMemoryCollection:
+                return client._collections.setdefault((db_name, coll_name), InMemoryCollection())
+
+        return _Database()
+
+    def close(self) -> None:
+        pass
+
+
+def seed_mongod(mongo_uri: str) -> None:
+    """Replace the collection on a real server with the synthetic year."""
+    from pymongo import MongoClient
+
+    client = MongoClient(mongo_uri)
+    collection = client[MONGO_DB][MONGO_COLLECTION]
+    collection.delete_many({})
+    collection.insert_many(synthetic_documents())
+    client.close()
+
+
+@contextmanager
+def mongo_backend(backend: str, mongo_uri: str | None, seed: bool):
+    """
+    Yield the URI the pages should use.
+
+    - mongod:   a real server at --mongo-uri (--seed replaces the collection first)
+    - mongomock / memory: pymongo.MongoClient is patched to return one seeded
+      client shared by all sessions. mongomock is faithful but takes minutes
+      to return a full-year collection; the in-memory stand-in only supports
+      the plain find() the Elhub page issues.
+    """
+    if backend == "mongod":
+        if seed:
+            seed_mongod(mongo_uri)
+        yield mongo_uri
+        return
+
+    if backend == "mongomock":
+        try:
+            import mongomock
+        except ImportError:
+            sys.exit("mongomock is not installed: pip install mongomock, or use another --backend.")
+        client = mongomock.MongoClient()
+    else:
+        client = InMemoryMongoClient()
+
+    client[MONGO_DB][MONGO_COLLECTION].insert_many(synthetic_documents())
+    with mock.patch("pymongo.MongoClient", lambda *args, **kwargs: client):
+        yield f"mongodb://{backend}"
+
+
+# ---------------- CONCURRENT APPTEST ----------------
+@contextmanager
+def concurrent_apptest_runtime(mongo_uri: str):
+    """
+    Let AppTests run on several threads at once.
+
+    Each AppTest run installs a mock Runtime singleton and removes it when it
+    finishes, which breaks runs still in progress on other threads. Here
+    Runtime.instance() falls back to the last runtime seen, and the Mongo
+    secrets are set once for every session instead of per run. Like the real
+    server, all sessions share one ScriptCache, so page scripts are compiled
+    once (concurrent ast.parse calls are not thread-safe on Python 3.11).
+    """
+    import streamlit as st
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.runtime.secrets import Secrets
+
+    last_runtime = {}
+
+    def instance(cls):
+        if cls._instance is not None:
+            last_runtime["runtime"] = cls._instance
+            return cls._instance
+        if "runtime" in last_runtime:
+            return last_runtime["runtime"]
+        raise RuntimeError("Runtime hasn't been created!")
+
+    def exists(cls):
+        return cls._instance is not None or "runtime" in last_runtime
+
+    secrets = Secrets()
+    secrets._secrets = {"mongo": {"uri": mongo_uri, "db": MONGO_DB, "collection": MONGO_COLLECTION}}
+    script_cache = ScriptCache()
+    with mock.patch.object(Runtime, "instance", classmethod(instance)), \
+            mock.patch.object(Runtime, "exists", classmethod(exists)), \
+            mock.patch.object(st, "secrets", secrets), \
+            mock.patch("streamlit.testing.v1.app_test.ScriptCache", lambda: script_cache), \
+            mock.patch("streamlit.testing.v1.local_script_runner.ScriptCache", lambda: script_cache):
+        yield
+
+
+# ---------------- SCRIPTED SESSIONS ----------------
+def _timed(at, latencies: list[float]):
+    start = time.perf_counter()
+    at.run()
+    latencies.append(time.perf_counter() - start)
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+
+
+def run_session(page: str, session_id: int) -> tuple[list[float], str | None]:
+    """
+    One user: open the page and click through a short scripted path.
+    Returns the rerun latencies and the error that stopped the session, if any.
+    """
+    latencies: list[float] = []
+    try:
+        _scripted_session(page, session_id, latencies)
+    except Exception as exc:  # a failed session is reported, not fatal
+        return latencies, f"{type(exc).__name__}: {exc}"
+    return latencies, None
+
+
+def _scripted_session(page: str, session_id: int, latencies: list[float]) -> None:
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(str(APP_ROOT / PAGES[page]), default_timeout=120)
+    _timed(at, latencies)
+
+    if page == "charts":
+        for months in (("2020-01", "2020-03"), ("2020-02", "2020-04"), ("2020-01", "2020-12")):
+            at.select_slider[0].set_value(months)
+            _timed(at, latencies)
+        at.selectbox[2].set_value(at.selectbox[2].options[1])
+        _timed(at, latencies)
+    elif page == "elhub":
+        # everyone starts on a different area, then steps through months
+        at.radio[0].set_value(PRICE_AREAS[session_id % len(PRICE_AREAS)])
+        _timed(at, latencies)
+        for month in (2, 3, 4):
+            at.selectbox[0].set_value(month)
+            _timed(at, latencies)
+
+
+def peak_rss_mb() -> float:
+    """Peak RSS of this process so far (one scenario per process, see main())."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def load_test(page: str, sessions: int) -> dict:
+    """Run `sessions` concurrent sessions on one page; return latency stats."""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions) as pool:
+        results = list(pool.map(lambda i: run_session(page, i), range(sessions)))
+    wall = time.perf_counter() - start
+
+    latencies = np.array([lat for session, _ in results for lat in session]) * 1000.0
+    errors = [error for _, error in results if error]
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) if len(latencies) else (np.nan,) * 3
+    return {
+        "page": page,
+        "sessions": sessions,
+        "errors": errors,
+        "reruns": len(latencies),
+        "p50_ms": p50,
+        "p95_ms": p95,
+        "p99_ms": p99,
+        "reruns_per_s": len(latencies) / wall,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def run_scenario(page: str, sessions: int, backend: str, mongo_uri: str | None) -> dict:
+    """
+    Runs inside a fresh process: one warm-up session (first-load caching is
+    not counted N times), then `sessions` concurrent sessions on `page`.
+    """
+    with mongo_backend(backend, mongo_uri, seed=False) as uri, concurrent_apptest_runtime(uri):
+        _, error = run_session(page, 0)
+        if error:
+            return {"page": page, "sessions": sessions, "warmup_error": error}
+        return load_test(page, sessions)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--pages", nargs="+", choices=list(PAGES), default=list(PAGES))
+    parser.add_argument("--backend", choices=["memory", "mongomock", "mongod"], default="memory")
+    parser.add_argument("--mongo-uri", default="mongodb://localhost:27017", help="server for --backend mongod")
+    parser.add_argument("--seed", action="store_true", help="mongod: replace the collection with synthetic data first")
+    parser.add_argument("--scenario", nargs=2, metavar=("PAGE", "SESSIONS"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.scenario:
+        page, sessions = args.scenario
+        print(json.dumps(run_scenario(page, int(sessions), args.backend, args.mongo_uri), default=float))
+        return
+
+    if args.backend == "mongod" and args.seed:
+        seed_mongod(args.mongo_uri)
+
+    print(f"{'page':<7} {'sessions':>8} {'reruns':>7} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'p99 ms':>8} {'reruns/s':>9} {'peak RSS MB':>12} {'errors':>7}")
+    for page in args.pages:
+        for count in args.sessions:
+            output = subprocess.run(
+                [sys.executable, "-m", "tools.load_test", "--scenario", page, str(count),
+                 "--backend", args.backend, "--mongo-uri", args.mongo_uri],
+                cwd=APP_ROOT, env=dict(os.environ), capture_output=True, text=True,
+            )
+            lines = output.stdout.strip().splitlines()
+            if output.returncode != 0 or not lines:
+                sys.exit(f"{page} x {count}: scenario process failed:\n{output.stderr[-2000:]}")
+            r = json.loads(lines[-1])
+            if "warmup_error" in r:
+                sys.exit(f"{page}: warm-up session failed: {r['warmup_error']}")
+            print(f"{r['page']:<7} {r['sessions']:>8} {r['reruns']:>7} {r['p50_ms']:>8.0f} "
+                  f"{r['p95_ms']:>8.0f} {r['p99_ms']:>8.0f} {r['reruns_per_s']:>9.1f} "
+                  f"{r['peak_rss_mb']:>12.0f} {len(r['errors']):>7}")
+            for error in sorted(set(r["errors"])):
+                print(f"    error: {error}")
+
+
+if __name__ == "__main__":
+    main()
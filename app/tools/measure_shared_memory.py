@@ -0,0 +1,121 @@
+# tools/measure_shared_memory.py
+"""
+Resident memory of N simulated sessions: per-session copies vs shared store.
+
+Each simulated session holds what a page holds during a rerun: the weather
+frame, the Elhub production frame and one filtered price-area slice.
+
+- copy:   every session gets its own deserialized copy (what st.cache_data does)
+- shared: every session gets the same read-only, memory-mapped frames
+
+Run from the app/ folder (each mode is measured in a fresh process):
+    python -m tools.measure_shared_memory --sessions 1 10 50
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from utils.common import read_time_indexed_csv, resolve_csv_path
+
+APP_ROOT = Path(__file__).resolve().parents[1]
+PRICE_AREAS = ["NO1", "NO2", "NO3", "NO4", "NO5"]
+PROD_GROUPS = ["solar", "hydro", "wind", "thermal", "other"]
+
+
+def resident_memory_mb() -> float:
+    """Current resident set size of this process (Linux /proc, else peak RSS)."""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as handle:
+            pages = int(handle.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def synthetic_production(year: int = 2021) -> pd.DataFrame:
+    """Elhub-shaped frame: one row per (area, group, hour) for a full year."""
+    hours = pd.date_range(f"{year}-01-01", f"{year + 1}-01-01", freq="h", tz="UTC", inclusive="left")
+    rng = np.random.default_rng(0)
+    n = len(PRICE_AREAS) * len(PROD_GROUPS) * len(hours)
+    df = pd.DataFrame({
+        "price_area": np.repeat(PRICE_AREAS, len(PROD_GROUPS) * len(hours)),
+        "production_group": np.tile(np.repeat(PROD_GROUPS, len(hours)), len(PRICE_AREAS)),
+        "start_time": np.tile(hours, len(PRICE_AREAS) * len(PROD_GROUPS)),
+        "quantity_kwh": rng.gamma(2.0, 50_000.0, size=n),
+    })
+    df["year"] = df["start_time"].dt.year
+    df["month"] = df["start_time"].dt.month
+    return df
+
+
+def _measure(mode: str, session_counts: list[int]) -> list[tuple[int, float]]:
+    """Run inside a fresh process: grow sessions and sample RSS at each count."""
+    from utils.shared_store import share_frame
+
+    weather = read_time_indexed_csv(resolve_csv_path(APP_ROOT))
+    production = synthetic_production()
+    if mode == "shared":
+        weather = share_frame(weather, "measure-weather")
+        production = share_frame(production, "measure-production")
+    weather_blob = pickle.dumps(weather)
+    production_blob = pickle.dumps(production)
+    gc.collect()
+
+    sessions, samples = [], []
+    for target in sorted(session_counts):
+        while len(sessions) < target:
+            area = PRICE_AREAS[len(sessions) % len(PRICE_AREAS)]
+            if mode == "copy":
+                session_weather = pickle.loads(weather_blob)
+                session_production = pickle.loads(production_blob)
+            else:
+                session_weather, session_production = weather, production
+            # touch the data like a rerun does
+            area_slice = session_production[session_production["price_area"] == area]
+            sessions.append((session_weather, session_production, area_slice["quantity_kwh"].sum()))
+        gc.collect()
+        samples.append((target, resident_memory_mb()))
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--mode", choices=["copy", "shared"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        for count, rss in _measure(args.mode, args.sessions):
+            print(f"{count} {rss:.1f}")
+        return
+
+    env = dict(os.environ)
+    env.setdefault("IND320_SHARED_DIR", str(Path(tempfile.gettempdir()) / "ind320-shared-measure"))
+    results = {}
+    for mode in ("copy", "shared"):
+        output = subprocess.run(
+            [sys.executable, "-m", "tools.measure_shared_memory", "--mode", mode,
+             "--sessions", *map(str, args.sessions)],
+            cwd=APP_ROOT, env=env, capture_output=True, text=True, check=True,
+        ).stdout
+        results[mode] = dict(line.split() for line in output.strip().splitlines())
+
+    print(f"{'sessions':>8} | {'copy RSS (MB)':>14} | {'shared RSS (MB)':>16}")
+    for count in sorted(args.sessions):
+        print(f"{count:>8} | {results['copy'][str(count)]:>14} | {results['shared'][str(count)]:>16}")
+
+
+if __name__ == "__main__":
+    main()
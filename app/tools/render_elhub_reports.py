@@ -0,0 +1,162 @@
+# tools/render_elhub_reports.py
+"""
+Render every Elhub chart of the report headlessly, in parallel.
+
+For one year this is one pie per price area and one hourly line chart per
+price area × month (5 + 60 charts), in any of PNG / SVG / PDF.
+
+Production is loaded once in the parent process into a dense
+[area, group, hour] cube (utils.production_cube) saved as .npy files; each
+worker process maps it read-only, keeps its own Matplotlib Agg backend and
+reuses the page's plotting helpers (utils.elhub).
+
+Run from the app/ folder, with data from a CSV export or from MongoDB:
+    python -m tools.render_elhub_reports --csv data/elhub_production_2021_raw.csv
+    python -m tools.render_elhub_reports --mongo-uri "$MONGO_URI" --formats png pdf
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import pandas as pd
+
+from utils.elhub import (
+    DEFAULT_YEAR,
+    clean_production_frame,
+    plot_hourly_production,
+    plot_production_pie,
+)
+from utils.production_cube import ProductionCube
+
+APP_ROOT = Path(__file__).resolve().parents[1]
+FORMATS = ["png", "svg", "pdf"]
+
+# per-worker state, set by _init_worker()
+_cube: ProductionCube | None = None
+
+
+# ---------------- DATA ----------------
+def load_production(csv: Path | None, mongo_uri: str | None, db: str, collection: str, year: int) -> pd.DataFrame:
+    """Raw Elhub rows from a CSV export or a MongoDB collection, cleaned like the page."""
+    if csv is not None:
+        raw = pd.read_csv(csv)
+    else:
+        from pymongo import MongoClient
+
+        client = MongoClient(mongo_uri, serverSelectionTimeoutMS=5000)
+        try:
+            raw = pd.DataFrame(list(client[db][collection].find({}, {"_id": 0})))
+        finally:
+            client.close()
+    return clean_production_frame(raw, year=year)
+
+
+# ---------------- WORKERS ----------------
+def _init_worker(cube_directory: str) -> None:
+    import matplotlib
+
+    matplotlib.use("Agg")
+    global _cube
+    _cube = ProductionCube.open(Path(cube_directory))
+
+
+def _save(fig, stem: Path, formats: list[str]) -> list[Path]:
+    paths = []
+    for fmt in formats:
+        path = stem.with_suffix(f".{fmt}")
+        fig.savefig(path, format=fmt, dpi=200, bbox_inches="tight")
+        paths.append(path)
+    return paths
+
+
+def _render_pie(area: str, year: int, out_dir: str, formats: list[str]) -> list[Path]:
+    fig = plot_production_pie(_cube.totals_by_group(area, year), area, year)
+    return _save(fig, Path(out_dir) / f"pie_{area}_{year}", formats)
+
+
+def _render_line(area: str, month: int, year: int, out_dir: str, formats: list[str]) -> list[Path]:
+    pivot = _cube.hourly(area, year, month)
+    if pivot.empty:
+        return []
+    fig = plot_hourly_production(pivot, area, month, year)
+    return _save(fig, Path(out_dir) / f"line_{area}_{year}-{month:02d}", formats)
+
+
+# ---------------- DRIVER ----------------
+def render_all(df_all: pd.DataFrame, out_dir: Path, formats: list[str], year: int, workers: int) -> dict:
+    """Render the full area × month matrix; return counts and timings."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    t0 = time.perf_counter()
+    cube = ProductionCube.from_frame(df_all)
+    months = sorted(int(m) for m in df_all["month"].unique())
+    t_aggregate = time.perf_counter() - t0
+
+    t1 = time.perf_counter()
+    files: list[Path] = []
+    charts = 0
+    with tempfile.TemporaryDirectory(prefix="elhub-report-cube-") as cube_directory:
+        cube.save(Path(cube_directory))
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(cube_directory,),
+        ) as pool:
+            futures = [
+                pool.submit(_render_pie, area, year, str(out_dir), formats)
+                for area in cube.areas
+            ]
+            futures += [
+                pool.submit(_render_line, area, month, year, str(out_dir), formats)
+                for area in cube.areas
+                for month in months
+            ]
+            for future in as_completed(futures):
+                written = future.result()
+                charts += bool(written)
+                files.extend(written)
+    t_render = time.perf_counter() - t1
+
+    return {
+        "charts": charts,
+        "files": len(files),
+        "aggregate_s": t_aggregate,
+        "render_s": t_render,
+        "charts_per_s": charts / t_render if t_render > 0 else float("inf"),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--csv", type=Path, help="CSV export of the Elhub production rows")
+    source.add_argument("--mongo-uri", default=os.environ.get("MONGO_URI"), help="MongoDB connection string")
+    parser.add_argument("--db", default="ind320")
+    parser.add_argument("--collection", default="elhub_production_2021")
+    parser.add_argument("--year", type=int, default=DEFAULT_YEAR)
+    parser.add_argument("--out", type=Path, default=APP_ROOT.parent / "docs" / "figures")
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=["png"])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+    if args.csv is None and not args.mongo_uri:
+        parser.error("give --csv, or --mongo-uri (or set MONGO_URI).")
+
+    df_all = load_production(args.csv, args.mongo_uri, args.db, args.collection, args.year)
+    if df_all.empty:
+        parser.error(f"No Elhub rows found for {args.year}.")
+
+    stats = render_all(df_all, args.out, args.formats, args.year, args.workers)
+    print(
+        f"{stats['charts']} charts ({stats['files']} files) → {args.out}\n"
+        f"aggregate: {stats['aggregate_s']:.2f} s | render: {stats['render_s']:.2f} s "
+        f"| {stats['charts_per_s']:.1f} charts/s with {args.workers} workers"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,6 @@ import re
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
-import streamlit as st
 import matplotlib.dates as mdates 
 
 # ---------------- PATH HELPERS ----------------
@@ -13,9 +12,8 @@ def resolve_csv_path(project_root_directory: Path) -> Path:
     return project_root_directory / "data" / "open-meteo-subset.csv"
 
 
-# ------------- DATA LOADING (CACHED) ----------
-@st.cache_data(show_spinner=True)
-def load_time_indexed_data(csv_file_path: Path) -> pd.DataFrame:
+# ------------- DATA LOADING -----------------
+def read_time_indexed_csv(csv_file_path: Path) -> pd.DataFrame:
     """
     Load CSV like in the notebook:
     - encoding='utf-8'
@@ -38,12 +36,24 @@ def load_time_indexed_data(csv_file_path: Path) -> pd.DataFrame:
     return data_frame
 
 
+def dataset_version(time_indexed_data: pd.DataFrame) -> str:
+    """Content hash of the frame (index + values), used as a cache / storage key."""
+    hashed = pd.util.hash_pandas_object(time_indexed_data, index=True).to_numpy()
+    return f"{len(time_indexed_data)}-{int(hashed.sum(dtype=np.uint64)):016x}"
+
+
 # ------------- MONTH HELPERS ------------------
 def list_distinct_month_strings_from_index(time_indexed_data: pd.DataFrame) -> list[str]:
     """Return YYYY-MM strings sorted."""
     month_strings = time_indexed_data.index.to_period("M").astype(str)
     return sorted(pd.Index(month_strings).unique().tolist())
 
+def month_range_bounds(start_month: str, end_month: str) -> tuple[pd.Timestamp, pd.Timestamp]:
+    """First and last instant (UTC) of the month range [start_month, end_month]."""
+    start = pd.Period(start_month, freq="M").start_time.tz_localize("UTC")
+    end = pd.Period(end_month, freq="M").end_time.tz_localize("UTC")
+    return start, end
+
 def filter_by_month_range(time_indexed_data: pd.DataFrame, start_month: str, end_month: str) -> pd.DataFrame:
     """Filter rows whose month (YYYY-MM) is in [start_month, end_month]."""
     month_strings = time_indexed_data.index.to_period("M").astype(str)
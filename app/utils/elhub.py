@@ -0,0 +1,105 @@
+# utils/elhub.py
+"""
+Cleaning and plotting helpers for the Elhub production page
+(aggregation lives in utils.production_cube).
+
+Figures are built with the object-oriented Matplotlib API (no pyplot state),
+so they can be rendered from background threads or worker processes.
+"""
+from __future__ import annotations
+
+import io
+
+import matplotlib.dates as mdates
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+DEFAULT_YEAR = 2021
+
+
+# ------------- CLEANING ----------------------
+def clean_production_frame(df: pd.DataFrame, year: int | None = DEFAULT_YEAR) -> pd.DataFrame:
+    """
+    Raw Elhub rows (from MongoDB or CSV) → frame ready for plotting:
+    parsed UTC start_time, numeric quantity_kwh, helper year/month columns,
+    optionally restricted to one year.
+    """
+    df = df.copy()
+
+    # parse timestamps + numeric
+    df["start_time"] = pd.to_datetime(df["start_time"], errors="coerce", utc=True)
+    df["quantity_kwh"] = pd.to_numeric(df["quantity_kwh"], errors="coerce")
+
+    # drop rows missing the essentials
+    df = df.dropna(subset=["start_time", "quantity_kwh"])
+
+    # helper cols
+    df["year"] = df["start_time"].dt.year
+    df["month"] = df["start_time"].dt.month
+
+    if year is not None:
+        df = df[df["year"] == year]
+    return df.reset_index(drop=True)
+
+
+# ------------- PLOTTING ----------------------
+def plot_production_pie(pie_df: pd.DataFrame, area: str, year: int = DEFAULT_YEAR) -> Figure:
+    """Pie chart of production share by source, percentages in the legend."""
+    fig = Figure(figsize=(4, 4))
+    ax_pie = fig.subplots()
+    wedges, _texts = ax_pie.pie(
+        pie_df["quantity_kwh"],
+        startangle=90,
+        wedgeprops={"linewidth": 0.5, "edgecolor": "white"},
+    )
+    ax_pie.set_title(f"Total production by source\n{area}, {year}")
+
+    # legend with percentages (instead of putting % on the pie)
+    total_val = pie_df["quantity_kwh"].sum()
+    legend_labels = []
+    for group_name, val in zip(pie_df["production_group"], pie_df["quantity_kwh"]):
+        pct = 100.0 * val / total_val if total_val > 0 else 0.0
+        legend_labels.append(f"{group_name} — {pct:.1f}%")
+
+    ax_pie.legend(
+        wedges,
+        legend_labels,
+        title="production_group",
+        loc="center left",
+        bbox_to_anchor=(1, 0.5),
+    )
+    return fig
+
+
+def plot_hourly_production(pivot: pd.DataFrame, area: str, month: int, year: int = DEFAULT_YEAR) -> Figure:
+    """Line chart of hourly production, one line per production group."""
+    fig = Figure(figsize=(6, 3))
+    ax_line = fig.subplots()
+
+    # plain Matplotlib dates: pandas' .plot() time-series path is not thread-safe
+    for group_name in pivot.columns:
+        ax_line.plot(pivot.index, pivot[group_name], linewidth=1.2, label=group_name)
+    locator = mdates.AutoDateLocator()
+    ax_line.xaxis.set_major_locator(locator)
+    ax_line.xaxis.set_major_formatter(mdates.ConciseDateFormatter(locator))
+
+    ax_line.set_title(f"Hourly production in {area} ({month:02d}/{year})")
+    ax_line.set_ylabel("kWh")
+    ax_line.set_xlabel("Time (UTC)")
+
+    ax_line.legend(
+        title="production_group",
+        fontsize="small",
+        ncol=2,
+        loc="upper right",
+    )
+    return fig
+
+
+def render_figure(fig: Figure, fmt: str = "png", dpi: int = 200) -> bytes:
+    """Render a figure to image bytes with its own Agg canvas (thread-safe)."""
+    FigureCanvasAgg(fig)
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format=fmt, dpi=dpi, bbox_inches="tight")
+    return buffer.getvalue()
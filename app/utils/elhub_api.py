@@ -0,0 +1,250 @@
+# utils/elhub_api.py
+"""
+Elhub Energy Data API client (ingestion side of the Elhub page).
+
+Responses go through an on-disk cache keyed on
+(area, dataset, productionGroup, startDate, endDate):
+- closed months (over for more than PUBLICATION_GRACE_DAYS) that came back
+  with every hour never change, so a cached copy is used as-is
+- any other month (current, recent, or with missing hours) is revalidated
+  with a conditional request (If-None-Match / If-Modified-Since); a 304
+  keeps the cached copy
+
+Entries are gzip-compressed JSON files named by the SHA-256 of the key.
+Transient failures (connection errors, 429, 5xx) are retried with backoff.
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import time
+from contextlib import nullcontext
+from pathlib import Path
+
+import pandas as pd
+import requests
+
+API_BASE = "https://api.elhub.no/energy-data/v0/price-areas"
+DATASET = "PRODUCTION_PER_GROUP_MBA_HOUR"
+PRODUCTION_COLUMNS = ["price_area", "production_group", "start_time", "quantity_kwh"]
+
+CACHE_DIR_ENV = "ELHUB_CACHE_DIR"
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+# Elhub publishes with a delay; periods are in Norwegian local time
+PUBLICATION_GRACE_DAYS = 7
+ELHUB_TIMEZONE = "Europe/Oslo"
+
+
+# ---------------- DISK CACHE ----------------
+def default_cache_directory() -> Path:
+    """$ELHUB_CACHE_DIR, or ~/.cache/ind320/elhub."""
+    root = os.environ.get(CACHE_DIR_ENV)
+    return Path(root) if root else Path.home() / ".cache" / "ind320" / "elhub"
+
+
+def cache_key(area: str, dataset: str, group: str, start_date: str, end_date: str) -> str:
+    """Stable SHA-256 name for one API request."""
+    key = json.dumps([area, dataset, group, start_date, end_date])
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """gzip JSON entries {"meta": {...}, "payload": <API response>} in one folder."""
+
+    def __init__(self, directory: Path | None = None):
+        self.directory = Path(directory) if directory is not None else default_cache_directory()
+
+    def path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json.gz"
+
+    def load(self, key: str) -> dict | None:
+        path = self.path(key)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as handle:
+                return json.load(handle)
+        except (OSError, ValueError):
+            # missing or corrupt entry → treat as a miss
+            return None
+
+    def store(self, key: str, payload: dict, meta: dict) -> None:
+        """Write atomically (temp file + rename) so readers never see partial files."""
+        path = self.path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(prefix=path.name, dir=path.parent)
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.open(raw, "wt", encoding="utf-8") as handle:
+                json.dump({"meta": meta, "payload": payload}, handle)
+            os.replace(tmp_name, path)
+        finally:
+            if os.path.exists(tmp_name):
+                os.remove(tmp_name)
+
+
+# ---------------- HTTP ----------------
+def get_with_retry(
+    session: requests.Session,
+    url: str,
+    params: dict,
+    headers: dict | None = None,
+    retries: int = 3,
+    backoff: float = 0.5,
+    timeout: float = 60,
+) -> requests.Response:
+    """
+    GET with retries on connection errors, timeouts, 429 and 5xx.
+    Waits backoff * 2**attempt seconds (or Retry-After when given).
+    Returns the last response; raises the last exception if all attempts fail.
+    """
+    for attempt in range(retries + 1):
+        try:
+            response = session.get(url, params=params, headers=headers, timeout=timeout)
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt == retries:
+                raise
+            time.sleep(backoff * 2**attempt)
+            continue
+
+        if response.status_code not in RETRY_STATUS or attempt == retries:
+            return response
+        retry_after = response.headers.get("Retry-After", "")
+        time.sleep(float(retry_after) if retry_after.isdigit() else backoff * 2**attempt)
+    return response
+
+
+# ---------------- PARSING ----------------
+def parse_production_payload(data_json: dict) -> pd.DataFrame:
+    """Elhub JSON response → DataFrame with PRODUCTION_COLUMNS."""
+    data = data_json.get("data", [])
+    if not data:
+        return pd.DataFrame(columns=PRODUCTION_COLUMNS)
+
+    attributes = data[0].get("attributes", {})
+    items = attributes.get("productionPerGroupMbaHour", [])
+
+    if not items:
+        return pd.DataFrame(columns=PRODUCTION_COLUMNS)
+
+    df = (
+        pd.json_normalize(items)[["priceArea", "productionGroup", "startTime", "quantityKwh"]]
+        .rename(columns={
+            "priceArea": "price_area",
+            "productionGroup": "production_group",
+            "startTime": "start_time",
+            "quantityKwh": "quantity_kwh",
+        })
+    )
+
+    df["start_time"] = pd.to_datetime(df["start_time"], utc=True, errors="coerce")
+    return df
+
+
+# ---------------- FETCH ----------------
+def month_dates(ym: str) -> tuple[str, str]:
+    """'2021-03' → ('2021-03-01', '2021-03-31'), as sent to the API."""
+    start = pd.Timestamp(f"{ym}-01")
+    end = start + pd.offsets.MonthEnd(1)
+    return start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")
+
+
+def is_closed_period(
+    end_date: str,
+    today: pd.Timestamp | None = None,
+    grace_days: int = PUBLICATION_GRACE_DAYS,
+) -> bool:
+    """True once the period ended more than `grace_days` ago (UTC): late data is in."""
+    today = pd.Timestamp.now(tz="UTC").normalize() if today is None else pd.Timestamp(today)
+    if today.tzinfo is None:
+        today = today.tz_localize("UTC")
+    return pd.Timestamp(end_date, tz="UTC") + pd.Timedelta(days=grace_days) < today.normalize()
+
+
+def hours_in_period(start_date: str, end_date: str) -> int:
+    """Hours from start_date to the end of end_date in Norwegian time (743/745 at DST changes)."""
+    start = pd.Timestamp(start_date).tz_localize(ELHUB_TIMEZONE)
+    end = (pd.Timestamp(end_date) + pd.Timedelta(days=1)).tz_localize(ELHUB_TIMEZONE)
+    return int((end - start) // pd.Timedelta(hours=1))
+
+
+def is_complete_period(df: pd.DataFrame, start_date: str, end_date: str) -> bool:
+    """True when the frame has a value for every hour of the period."""
+    return df["start_time"].nunique() >= hours_in_period(start_date, end_date)
+
+
+def fetch_month_one_group(
+    area: str,
+    ym: str,
+    group: str,
+    cache: ResponseCache | None = None,
+    session: requests.Session | None = None,
+    api_base: str = API_BASE,
+    dataset: str = DATASET,
+    today: pd.Timestamp | None = None,
+) -> pd.DataFrame:
+    """
+    Fetch hourly production data for a specific area, month and production group.
+    Pass one `session` (and `cache`) when fetching many months; a session
+    created here is closed before returning.
+    """
+    cache = cache if cache is not None else ResponseCache()
+    with requests.Session() if session is None else nullcontext(session) as session:
+        return _fetch_month_one_group(area, ym, group, cache, session, api_base, dataset, today)
+
+
+def _fetch_month_one_group(
+    area: str,
+    ym: str,
+    group: str,
+    cache: ResponseCache,
+    session: requests.Session,
+    api_base: str,
+    dataset: str,
+    today: pd.Timestamp | None,
+) -> pd.DataFrame:
+    start, end = month_dates(ym)
+
+    key = cache_key(area, dataset, group, start, end)
+    entry = cache.load(key)
+    closed = is_closed_period(end, today)
+    if entry is not None and entry["meta"].get("immutable"):
+        return parse_production_payload(entry["payload"])
+
+    url = f"{api_base}/{area}"
+    params = {
+        "dataset": dataset,
+        "startDate": start,
+        "endDate": end,
+        "productionGroup": group,
+    }
+
+    # revalidate the cached copy of an open month instead of re-downloading it
+    headers = {}
+    if entry is not None:
+        if entry["meta"].get("etag"):
+            headers["If-None-Match"] = entry["meta"]["etag"]
+        if entry["meta"].get("last_modified"):
+            headers["If-Modified-Since"] = entry["meta"]["last_modified"]
+
+    response = get_with_retry(session, url, params, headers=headers or None)
+    if response.status_code == 304 and entry is not None:
+        payload = entry["payload"]
+    else:
+        response.raise_for_status()
+        payload = response.json()
+    df = parse_production_payload(payload)
+
+    meta = {
+        "params": {"area": area, **params},
+        "etag": response.headers.get("ETag", entry["meta"].get("etag") if entry else None),
+        "last_modified": response.headers.get(
+            "Last-Modified", entry["meta"].get("last_modified") if entry else None
+        ),
+        "fetched_at": pd.Timestamp.now(tz="UTC").isoformat(),
+        # missing hours may be data not yet published: keep revalidating
+        "immutable": closed and is_complete_period(df, start, end),
+    }
+    cache.store(key, payload, meta)
+    return df
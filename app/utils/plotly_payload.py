@@ -0,0 +1,89 @@
+# utils/plotly_payload.py
+"""
+Compact Plotly figures for long multi-column time series.
+
+- x axis: regularly spaced indexes are sent once as x0 + dx (no x array);
+  irregular ones as epoch-millisecond typed arrays instead of date strings
+- y values: NumPy arrays (float32 when no precision is lost), which
+  plotly >= 6 serializes as base64 typed arrays instead of JSON number lists
+- JSON: orjson engine when installed
+"""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.io as pio
+from plotly.subplots import make_subplots
+
+try:
+    import orjson  # noqa: F401
+    pio.json.config.default_engine = "orjson"
+except ImportError:
+    pass
+
+
+# ------------- ARRAY ENCODING ----------------
+def compact_time_axis(index: pd.DatetimeIndex) -> dict:
+    """
+    Trace kwargs for the x axis: {'x0', 'dx'} when the index is evenly spaced,
+    otherwise {'x': epoch milliseconds as float64} (plotly reads numbers on a
+    date axis as ms since epoch, UTC).
+    """
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_convert("UTC").tz_localize(None)
+    ms = index.as_unit("ms").asi8
+    if len(ms) >= 2:
+        steps = np.diff(ms)
+        if (steps == steps[0]).all() and steps[0] > 0:
+            return {"x0": index[0].strftime("%Y-%m-%d %H:%M:%S"), "dx": int(steps[0])}
+    return {"x": ms.astype(np.float64)}
+
+
+def compact_values(values) -> np.ndarray:
+    """float32 when the round trip keeps ~7 significant digits, else float64."""
+    values = np.asarray(values, dtype=np.float64)
+    as_float32 = values.astype(np.float32)
+    if np.allclose(as_float32, values, rtol=1e-6, atol=0.0, equal_nan=True):
+        return as_float32
+    return values
+
+
+def payload_size_bytes(fig: go.Figure) -> int:
+    """Size of the JSON sent to the browser for this figure."""
+    return len(pio.to_json(fig, validate=False))
+
+
+# ------------- FIGURE BUILDING ---------------
+def build_multi_series_figure(
+    time_indexed_data: pd.DataFrame,
+    primary_columns: list[str],
+    secondary_columns: list[str] | None = None,
+) -> go.Figure:
+    """All selected columns on one chart, secondary columns dashed on the right axis."""
+    fig = make_subplots(specs=[[{"secondary_y": True}]])
+    x_kwargs = compact_time_axis(time_indexed_data.index)
+
+    # Primary Y-axis traces (left side)
+    for c in primary_columns:
+        fig.add_trace(
+            go.Scatter(y=compact_values(time_indexed_data[c]), name=c, mode="lines", **x_kwargs),
+            secondary_y=False,
+        )
+
+    # Secondary Y-axis traces (right side)
+    for c in secondary_columns or []:
+        fig.add_trace(
+            go.Scatter(
+                y=compact_values(time_indexed_data[c]),
+                name=c,
+                mode="lines",
+                line=dict(dash="dash"),
+                **x_kwargs,
+            ),
+            secondary_y=True,
+        )
+
+    fig.update_xaxes(type="date")
+    return fig
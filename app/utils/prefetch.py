@@ -0,0 +1,155 @@
+# utils/prefetch.py
+"""
+Speculative background prefetch of likely next views.
+
+After each interaction a page schedules the views the user will probably ask
+for next (adjacent months, other price areas). They are computed on a small
+thread pool and kept in a bounded LRU cache, so the next click is a cache hit.
+A new batch from a session cancels that session's tasks still queued.
+"""
+from __future__ import annotations
+
+import sys
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Hashable
+
+import pandas as pd
+import streamlit as st
+
+
+def _approx_size(value: Any) -> int:
+    """Rough memory footprint in bytes of a cached view."""
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=False).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=False))
+    if isinstance(value, tuple):
+        return sum(_approx_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class ViewPrefetcher:
+    """
+    Thread-pool prefetcher with a bounded LRU cache.
+
+    - get(key, compute): cached value, or wait for an in-flight prefetch,
+      or compute now in the caller's thread
+    - prefetch({key: compute}, owner): queue background work, cancelling the
+      owner's older pending tasks that are not part of the new batch
+
+    The cache holds at most `max_entries` values and `max_bytes` bytes.
+    """
+
+    def __init__(self, max_workers: int = 2, max_entries: int = 64, max_bytes: int = 64 * 2**20):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch")
+        self._lock = threading.Lock()
+        self._cache: OrderedDict[Hashable, tuple[Any, int]] = OrderedDict()
+        self._bytes = 0
+        self._pending: dict[Hashable, tuple[Future, Hashable]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    # ---------------- CACHE ----------------
+    def _store(self, key: Hashable, value: Any) -> None:
+        size = _approx_size(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._cache:
+                self._bytes -= self._cache.pop(key)[1]
+            self._cache[key] = (value, size)
+            self._bytes += size
+            while len(self._cache) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._cache.popitem(last=False)
+                self._bytes -= evicted_size
+
+    def cached(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._cache
+
+    def get(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Return the view for `key`, computing it in the foreground if needed."""
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return self._cache[key][0]
+            future = self._pending.get(key, (None, None))[0]
+            # still queued behind other sessions' work: take it over and
+            # compute in the foreground; only wait for a task already running
+            if future is not None and future.cancel():
+                del self._pending[key]
+                future = None
+
+        if future is not None and not future.cancelled():
+            try:
+                value = future.result()
+                with self._lock:
+                    self.hits += 1
+                return value
+            except Exception:
+                pass  # fall back to a foreground computation
+
+        with self._lock:
+            self.misses += 1
+        value = compute()
+        self._store(key, value)
+        return value
+
+    # ---------------- BACKGROUND ----------------
+    def _run(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        try:
+            value = compute()
+            self._store(key, value)
+            return value
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+    def prefetch(self, tasks: dict[Hashable, Callable[[], Any]], owner: Hashable = None) -> None:
+        """
+        Schedule `tasks` in the background. Pending tasks previously scheduled
+        by the same `owner` (e.g. a session id) and not in this batch are cancelled.
+        """
+        with self._lock:
+            for key, (future, task_owner) in list(self._pending.items()):
+                if task_owner == owner and key not in tasks and future.cancel():
+                    del self._pending[key]
+            for key, compute in tasks.items():
+                if key in self._cache or key in self._pending:
+                    continue
+                self._pending[key] = (self._executor.submit(self._run, key, compute), owner)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._cache),
+                "bytes": self._bytes,
+                "pending": len(self._pending),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def shutdown(self) -> None:
+        """Cancel pending work and stop the worker threads."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def session_owner() -> str:
+    """Stable id for the current Streamlit session (prefetch task owner)."""
+    if "_prefetch_owner" not in st.session_state:
+        st.session_state["_prefetch_owner"] = uuid.uuid4().hex
+    return st.session_state["_prefetch_owner"]
+
+
+@st.cache_resource(show_spinner=False)
+def get_view_prefetcher(name: str) -> ViewPrefetcher:
+    """One prefetcher per page, shared by all sessions of this process."""
+    return ViewPrefetcher()
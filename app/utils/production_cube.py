@@ -0,0 +1,210 @@
+# utils/production_cube.py
+"""
+Dense hourly production cube for the Elhub views.
+
+Production is loaded once into a float array of shape
+[price_area, production_group, hour], plus a boolean mask of the cells that
+actually had data and label → index maps for areas and groups. Every view
+of the Elhub page is then an array slice and an axis sum (no groupby or
+pivot per rerun).
+
+Hour axis: consecutive UTC hours from 1 January 00:00 UTC of the first year
+to the end of the last year, so several years live in one cube and a
+(year, month) is an O(1) slice. Elhub timestamps carry a local offset
+(+01:00 / +02:00); they are converted to UTC first, so the 23- and 25-hour
+local days at DST changes still map to distinct, gap-free UTC hours. Naive
+timestamps are taken as UTC, like clean_production_frame().
+"""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+HOUR = pd.Timedelta(hours=1)
+_META_FILE = "cube.json"
+
+
+class ProductionCube:
+    """Read-only [area, group, hour] production array with a missing-value mask."""
+
+    def __init__(
+        self,
+        values: np.ndarray,
+        present: np.ndarray,
+        areas: list[str],
+        groups: list[str],
+        first_year: int,
+    ):
+        if values.shape != present.shape or values.shape[:2] != (len(areas), len(groups)):
+            raise ValueError("values, present, areas and groups do not describe the same cube.")
+        self.values = values
+        self.present = present
+        self.areas = list(areas)
+        self.groups = list(groups)
+        self.area_index = {area: i for i, area in enumerate(self.areas)}
+        self.group_index = {group: i for i, group in enumerate(self.groups)}
+        self.start = pd.Timestamp(year=first_year, month=1, day=1, tz="UTC")
+        for array in (self.values, self.present):
+            if array.flags.writeable:
+                array.flags.writeable = False
+
+    # ---------------- BUILD ----------------
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "ProductionCube":
+        """
+        Build from Elhub rows (price_area, production_group, start_time,
+        quantity_kwh). Rows falling in the same hour cell are summed; rows
+        without a time or a quantity are ignored.
+        """
+        start_time = pd.to_datetime(df["start_time"], errors="coerce", utc=True)
+        quantity = pd.to_numeric(df["quantity_kwh"], errors="coerce")
+        keep = (start_time.notna() & quantity.notna()).to_numpy()
+        if not keep.any():
+            raise ValueError("No production rows to build a cube from.")
+
+        hours = pd.DatetimeIndex(start_time[keep]).floor("h")
+        area_codes, areas = pd.factorize(df["price_area"][keep].astype(str), sort=True)
+        group_codes, groups = pd.factorize(df["production_group"][keep].astype(str), sort=True)
+
+        first_year, last_year = hours.min().year, hours.max().year
+        start = pd.Timestamp(year=first_year, month=1, day=1, tz="UTC")
+        end = pd.Timestamp(year=last_year + 1, month=1, day=1, tz="UTC")
+        n_hours = (end - start) // HOUR
+        hour_codes = ((hours - start) // HOUR).to_numpy(dtype=np.int64)
+
+        # one flat bincount fills every cell (duplicates are summed)
+        shape = (len(areas), len(groups), n_hours)
+        flat = np.ravel_multi_index((area_codes, group_codes, hour_codes), shape)
+        size = int(np.prod(shape))
+        values = np.bincount(flat, weights=quantity[keep].to_numpy(dtype=np.float64), minlength=size)
+        present = np.bincount(flat, minlength=size) > 0
+        return cls(values.reshape(shape), present.reshape(shape), list(areas), list(groups), first_year)
+
+    # ---------------- SAVE / OPEN ----------------
+    def save(self, directory: Path) -> Path:
+        """Write the arrays as .npy files plus a small JSON with the labels."""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        np.save(directory / "values.npy", self.values)
+        np.save(directory / "present.npy", self.present)
+        meta = {"areas": self.areas, "groups": self.groups, "first_year": self.start.year}
+        (directory / _META_FILE).write_text(json.dumps(meta), encoding="utf-8")
+        return directory
+
+    @classmethod
+    def open(cls, directory: Path) -> "ProductionCube":
+        """Reopen a saved cube with memory-mapped, read-only arrays."""
+        directory = Path(directory)
+        meta = json.loads((directory / _META_FILE).read_text(encoding="utf-8"))
+        return cls(
+            np.load(directory / "values.npy", mmap_mode="r"),
+            np.load(directory / "present.npy", mmap_mode="r"),
+            meta["areas"],
+            meta["groups"],
+            meta["first_year"],
+        )
+
+    # ---------------- HOUR AXIS ----------------
+    @property
+    def years(self) -> list[int]:
+        end = self.start + self.values.shape[2] * HOUR
+        return list(range(self.start.year, end.year))
+
+    @property
+    def nbytes(self) -> int:
+        return self.values.nbytes + self.present.nbytes
+
+    def hour_slice(self, start: pd.Timestamp, end: pd.Timestamp) -> slice:
+        """Hours in [start, end) (UTC; naive timestamps are taken as UTC), clipped to the cube."""
+        bounds = []
+        for ts in (pd.Timestamp(start), pd.Timestamp(end)):
+            ts = ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")
+            bounds.append(min(max(-((self.start - ts) // HOUR), 0), self.values.shape[2]))
+        return slice(bounds[0], max(bounds))
+
+    def period_slice(self, year: int | None = None, month: int | None = None) -> slice:
+        """Hours of a UTC calendar year or month; the whole cube when year is None."""
+        if year is None:
+            return slice(0, self.values.shape[2])
+        if month is None:
+            start = pd.Timestamp(year=year, month=1, day=1, tz="UTC")
+            return self.hour_slice(start, start + pd.DateOffset(years=1))
+        start = pd.Timestamp(year=year, month=month, day=1, tz="UTC")
+        return self.hour_slice(start, start + pd.DateOffset(months=1))
+
+    def hour_index(self, hours: slice) -> pd.DatetimeIndex:
+        return pd.date_range(self.start + hours.start * HOUR, periods=hours.stop - hours.start,
+                             freq="h", name="start_time")
+
+    def _group_positions(self, groups: list[str] | None) -> list[int]:
+        if groups is None:
+            return list(range(len(self.groups)))
+        return sorted(self.group_index[g] for g in groups if g in self.group_index)
+
+    # ---------------- VIEWS ----------------
+    def totals_by_group(self, area: str, year: int | None = None, month: int | None = None) -> pd.DataFrame:
+        """
+        Total production per production_group for one price area (largest
+        first); groups without any data in the period are left out.
+        """
+        if area not in self.area_index:
+            return pd.DataFrame(columns=["production_group", "quantity_kwh"])
+        a, hours = self.area_index[area], self.period_slice(year, month)
+        totals = self.values[a, :, hours].sum(axis=1)
+        has_data = self.present[a, :, hours].any(axis=1)
+        pie_df = pd.DataFrame({
+            "production_group": np.asarray(self.groups, dtype=object)[has_data],
+            "quantity_kwh": totals[has_data],
+        })
+        return pie_df.sort_values("quantity_kwh", ascending=False, kind="stable").reset_index(drop=True)
+
+    def hourly(self, area: str, year: int, month: int, groups: list[str] | None = None) -> pd.DataFrame:
+        """
+        Hourly production for one area and month, one column per production
+        group (NaN where a group has no data); empty when nothing is left.
+        """
+        positions = self._group_positions(groups)
+        if area not in self.area_index or not positions:
+            return pd.DataFrame()
+        a, hours = self.area_index[area], self.period_slice(year, month)
+        values = self.values[a, positions, hours]
+        present = self.present[a, positions, hours]
+
+        # same shape as a pivot of the rows: only groups and hours with data
+        columns = present.any(axis=1)
+        rows = present[columns].any(axis=0)
+        if not rows.any():
+            return pd.DataFrame()
+        data = np.where(present, values, np.nan)[columns][:, rows]
+        labels = [self.groups[p] for p, keep in zip(positions, columns) if keep]
+        pivot = pd.DataFrame(data.T, index=self.hour_index(hours)[rows], columns=labels)
+        pivot.columns.name = "production_group"
+        return pivot
+
+    def totals_by_area(
+        self, year: int | None = None, month: int | None = None, groups: list[str] | None = None
+    ) -> pd.DataFrame:
+        """Multi-area comparison: total kWh per price area (rows) and production group (columns)."""
+        positions = self._group_positions(groups)
+        totals = self.values[:, positions, self.period_slice(year, month)].sum(axis=2)
+        return pd.DataFrame(
+            totals,
+            index=pd.Index(self.areas, name="price_area"),
+            columns=pd.Index([self.groups[p] for p in positions], name="production_group"),
+        )
+
+    def hourly_by_area(self, year: int, month: int, groups: list[str] | None = None) -> pd.DataFrame:
+        """Multi-area comparison: hourly production summed over `groups`, one column per price area."""
+        positions = self._group_positions(groups)
+        hours = self.period_slice(year, month)
+        values = self.values[:, positions, hours].sum(axis=1)
+        present = self.present[:, positions, hours].any(axis=1)
+        comparison = pd.DataFrame(
+            np.where(present, values, np.nan).T,
+            index=self.hour_index(hours),
+            columns=pd.Index(self.areas, name="price_area"),
+        )
+        return comparison.dropna(how="all")
@@ -0,0 +1,173 @@
+# utils/resampling.py
+"""
+Resolution pyramid for the time-indexed weather data.
+
+Hourly rows are aggregated once into daily, weekly and monthly levels.
+Each level stores additive partial aggregates (sum, count, min, max and,
+for directions, sin/cos sums) so that each coarser level is built from a
+finer one in a single grouped pass, and every statistic stays exact.
+The hourly level is the raw frame itself and is not kept in the pyramid.
+"""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.common import dataset_version
+
+# ---------------- LEVELS ----------------
+RESOLUTIONS = ["hourly", "daily", "weekly", "monthly"]
+
+# level → (finer level it is built from, pandas frequency)
+# months are built from days because weeks straddle month boundaries
+_LEVEL_SOURCES = {
+    "daily": ("hourly", "D"),
+    "weekly": ("daily", "W-MON"),
+    "monthly": ("daily", "MS"),
+}
+
+STATISTICS = ["auto", "mean", "min", "max", "sum"]
+
+
+# ---------------- REDUCERS ----------------
+def default_reducer(column_name: str) -> str:
+    """
+    Pick the natural aggregate for a variable, based on its name:
+    - precipitation → sum
+    - gusts → max
+    - direction (°) → circular mean
+    - anything else (temperature, speed, ...) → mean
+    """
+    name = str(column_name).lower()
+    if "precipitation" in name or "rain" in name or "snowfall" in name:
+        return "sum"
+    if "gust" in name:
+        return "max"
+    if "direction" in name:
+        return "circular_mean"
+    return "mean"
+
+
+def circular_mean_degrees(sin_sum, cos_sum) -> np.ndarray:
+    """Mean angle in [0, 360) from summed sines and cosines."""
+    angle = np.degrees(np.arctan2(sin_sum, cos_sum)) % 360.0
+    return np.where((np.asarray(sin_sum) == 0) & (np.asarray(cos_sum) == 0), np.nan, angle)
+
+
+# ---------------- PYRAMID BUILD ----------------
+def _hourly_partials(time_indexed_data: pd.DataFrame, numeric_cols: list[str]) -> pd.DataFrame:
+    """Per-row partial aggregates, with a (column, part) MultiIndex on columns."""
+    parts = {}
+    for col in numeric_cols:
+        values = time_indexed_data[col].astype(float)
+        present = values.notna()
+        parts[(col, "sum")] = values.fillna(0.0)
+        parts[(col, "count")] = present.astype(float)
+        parts[(col, "min")] = values
+        parts[(col, "max")] = values
+        if default_reducer(col) == "circular_mean":
+            radians = np.radians(values)
+            parts[(col, "sin")] = np.sin(radians).fillna(0.0)
+            parts[(col, "cos")] = np.cos(radians).fillna(0.0)
+    return pd.DataFrame(parts, index=time_indexed_data.index)
+
+
+def _coarsen(partials: pd.DataFrame, freq: str) -> pd.DataFrame:
+    """One grouped pass: sums for additive parts, min/max for the extremes."""
+    how = {
+        key: ("min" if key[1] == "min" else "max" if key[1] == "max" else "sum")
+        for key in partials.columns
+    }
+    grouper = pd.Grouper(freq=freq, label="left", closed="left")
+    coarse = partials.groupby(grouper).agg(how)
+    coarse.columns = pd.MultiIndex.from_tuples(coarse.columns)
+    # drop empty bins created by gaps in the index
+    counts = coarse.xs("count", axis=1, level=1)
+    return coarse.loc[counts.sum(axis=1) > 0]
+
+
+def build_resolution_pyramid(time_indexed_data: pd.DataFrame) -> dict[str, pd.DataFrame]:
+    """
+    Return {resolution: partial aggregates} for daily → weekly → monthly.
+    Daily is computed from the raw rows, coarser levels from a finer level.
+    The per-row partials are only needed for the daily pass and are dropped.
+    """
+    numeric_cols = time_indexed_data.select_dtypes(include="number").columns.tolist()
+    pyramid = {"hourly": _hourly_partials(time_indexed_data, numeric_cols)}
+    for level, (source, freq) in _LEVEL_SOURCES.items():
+        pyramid[level] = _coarsen(pyramid[source], freq)
+    del pyramid["hourly"]
+    return pyramid
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _cached_pyramid(version: str, _time_indexed_data: pd.DataFrame) -> dict[str, pd.DataFrame]:
+    """Pyramid shared across sessions and reruns, keyed by dataset version only."""
+    return build_resolution_pyramid(_time_indexed_data)
+
+
+def get_resolution_pyramid(time_indexed_data: pd.DataFrame) -> dict[str, pd.DataFrame]:
+    """Cached pyramid for this dataset (rebuilt only when the content changes)."""
+    return _cached_pyramid(dataset_version(time_indexed_data), time_indexed_data)
+
+
+# ---------------- PYRAMID READ ----------------
+def resample_from_pyramid(
+    pyramid: dict[str, pd.DataFrame],
+    resolution: str,
+    statistic: str = "auto",
+    column_names: list[str] | None = None,
+) -> pd.DataFrame:
+    """
+    Materialize one level as a plain time-indexed frame (one column per variable).
+    statistic: 'auto' (per-variable reducer) | 'mean' | 'min' | 'max' | 'sum'
+    """
+    if resolution not in pyramid:
+        raise ValueError(
+            f"Unknown resolution '{resolution}'. Expected one of {list(pyramid)} "
+            "(hourly data is the raw frame)."
+        )
+    if statistic not in STATISTICS:
+        raise ValueError(f"Unknown statistic '{statistic}'. Expected one of {STATISTICS}.")
+
+    level = pyramid[resolution]
+    if column_names is None:
+        column_names = level.columns.get_level_values(0).unique().tolist()
+
+    out = {}
+    for col in column_names:
+        part = level[col]
+        count = part["count"].to_numpy()
+        how = default_reducer(col) if statistic == "auto" else statistic
+        if how == "circular_mean":
+            values = circular_mean_degrees(part["sin"].to_numpy(), part["cos"].to_numpy())
+        elif how == "mean":
+            with np.errstate(invalid="ignore", divide="ignore"):
+                values = part["sum"].to_numpy() / count
+        else:
+            values = part[how].to_numpy()
+        out[col] = np.where(count > 0, values, np.nan)
+    return pd.DataFrame(out, index=level.index)
+
+
+def slice_to_span(resampled: pd.DataFrame, start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
+    """Keep every bin that overlaps [start, end] (bins are labelled by their start)."""
+    first = max(resampled.index.searchsorted(start, side="right") - 1, 0)
+    last = resampled.index.searchsorted(end, side="right")
+    return resampled.iloc[first:last]
+
+
+def choose_resolution(start: pd.Timestamp, end: pd.Timestamp) -> str:
+    """
+    Pick a resolution from the selected time span:
+    ≤ 31 days → hourly, ≤ 6 months → daily, ≤ 3 years → weekly, else monthly.
+    """
+    span_days = (pd.Timestamp(end) - pd.Timestamp(start)).total_seconds() / 86400.0
+    if span_days <= 31:
+        return "hourly"
+    if span_days <= 183:
+        return "daily"
+    if span_days <= 3 * 366:
+        return "weekly"
+    return "monthly"
@@ -0,0 +1,188 @@
+# utils/shared_store.py
+"""
+Read-only datasets shared by every Streamlit session (and worker process).
+
+`st.cache_data` hands each caller its own deserialized copy of a frame, so
+memory grows with the number of sessions. Here a frame is written once as
+one .npy file per column and reopened memory-mapped: all sessions of a
+process share the same object (`st.cache_resource`), and separate processes
+opening the same files share the OS page cache.
+
+The buffers are read-only: writing into a shared frame raises. Filters,
+selections and new columns give ordinary frames; call .copy() before
+modifying a slice in place.
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.common import dataset_version, read_time_indexed_csv
+
+SHARED_DIR_ENV = "IND320_SHARED_DIR"
+_META_FILE = "meta.json"
+
+
+# ---------------- LOCATION ----------------
+def shared_directory() -> Path:
+    """Root folder for shared column files ($IND320_SHARED_DIR or the temp dir)."""
+    root = os.environ.get(SHARED_DIR_ENV) or Path(tempfile.gettempdir()) / "ind320-shared"
+    return Path(root)
+
+
+# ---------------- WRITE ----------------
+def _column_kind(series: pd.Series) -> str:
+    if isinstance(series.dtype, pd.DatetimeTZDtype) or pd.api.types.is_datetime64_dtype(series.dtype):
+        return "datetime"
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return "category"
+    if pd.api.types.is_bool_dtype(series.dtype) or pd.api.types.is_numeric_dtype(series.dtype):
+        return "numeric"
+    # strings and other objects are stored as categorical codes
+    return "category"
+
+
+def _datetime_int64(values) -> tuple[np.ndarray, str | None, str]:
+    """Datetime values → (int64 UTC ticks since epoch, timezone name or None, unit)."""
+    index = pd.DatetimeIndex(values)
+    tz = str(index.tz) if index.tz is not None else None
+    if tz is not None:
+        index = index.tz_convert("UTC").tz_localize(None)
+    return index.asi8, tz, index.unit
+
+
+def write_shared_frame(frame: pd.DataFrame, directory: Path) -> None:
+    """
+    Write `frame` as one .npy file per column (+ index and a meta.json).
+    Files go to a temporary folder first and are renamed into place, so a
+    concurrent reader never sees a half-written dataset.
+    """
+    directory = Path(directory)
+    directory.parent.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(prefix=directory.name + ".", dir=directory.parent))
+
+    meta = {"columns": [], "index": None}
+    try:
+        for position, name in enumerate(frame.columns):
+            series = frame.iloc[:, position]
+            kind = _column_kind(series)
+            entry = {"name": name, "kind": kind, "file": f"col{position}.npy"}
+            if kind == "datetime":
+                values, entry["tz"], entry["unit"] = _datetime_int64(series)
+            elif kind == "category":
+                categorical = pd.Categorical(series)
+                values = categorical.codes
+                entry["categories"] = categorical.categories.tolist()
+            else:
+                values = series.to_numpy()
+            np.save(staging / entry["file"], np.ascontiguousarray(values))
+            meta["columns"].append(entry)
+
+        index = frame.index
+        if isinstance(index, pd.DatetimeIndex):
+            values, tz, unit = _datetime_int64(index)
+            np.save(staging / "index.npy", values)
+            meta["index"] = {"kind": "datetime", "tz": tz, "unit": unit, "name": index.name}
+        elif isinstance(index, pd.RangeIndex):
+            meta["index"] = {
+                "kind": "range", "start": index.start, "stop": index.stop,
+                "step": index.step, "name": index.name,
+            }
+        else:
+            raise TypeError(f"Unsupported index type for a shared frame: {type(index).__name__}.")
+
+        (staging / _META_FILE).write_text(json.dumps(meta, default=str), encoding="utf-8")
+        try:
+            os.replace(staging, directory)
+        except OSError:
+            # another process published the same version first
+            if not (directory / _META_FILE).exists():
+                raise
+    finally:
+        if staging.exists():
+            shutil.rmtree(staging, ignore_errors=True)
+
+
+# ---------------- READ ----------------
+def _open_datetime(path: Path, tz: str | None, unit: str) -> pd.DatetimeIndex:
+    values = np.load(path, mmap_mode="r").view(f"M8[{unit}]")
+    # naive timestamps stay mapped; localizing makes one copy per process
+    index = pd.DatetimeIndex(values, copy=False)
+    return index.tz_localize("UTC").tz_convert(tz) if tz else index
+
+
+def open_shared_frame(directory: Path) -> pd.DataFrame:
+    """Reopen a frame written by write_shared_frame() with memory-mapped, read-only columns."""
+    directory = Path(directory)
+    meta = json.loads((directory / _META_FILE).read_text(encoding="utf-8"))
+
+    columns = {}
+    for entry in meta["columns"]:
+        path = directory / entry["file"]
+        if entry["kind"] == "datetime":
+            columns[entry["name"]] = _open_datetime(path, entry["tz"], entry["unit"])
+        elif entry["kind"] == "category":
+            codes = np.load(path, mmap_mode="r")
+            columns[entry["name"]] = pd.Categorical.from_codes(codes, categories=entry["categories"])
+        else:
+            columns[entry["name"]] = np.load(path, mmap_mode="r")
+
+    index_meta = meta["index"]
+    if index_meta["kind"] == "datetime":
+        index = _open_datetime(directory / "index.npy", index_meta["tz"], index_meta["unit"])
+    else:
+        index = pd.RangeIndex(index_meta["start"], index_meta["stop"], index_meta["step"])
+    index.name = index_meta["name"]
+
+    return pd.DataFrame(columns, index=index, copy=False)
+
+
+def _prune_versions(name: str, keep: Path) -> None:
+    """
+    Remove the other published versions of `name`. Processes still mapping
+    an old version keep their data (POSIX unlink semantics); where files in
+    use cannot be removed, they are left for the next publish.
+    """
+    version_pattern = re.compile(re.escape(name) + r"-\d+-[0-9a-f]{16}")
+    for sibling in keep.parent.iterdir():
+        if sibling != keep and sibling.is_dir() and version_pattern.fullmatch(sibling.name):
+            shutil.rmtree(sibling, ignore_errors=True)
+
+
+def publish_frame(frame: pd.DataFrame, name: str) -> Path:
+    """
+    Write `frame` under `name` (one folder per content version) unless that
+    version is already published, and return its folder. Older versions of
+    the same `name` are removed once the new one is in place.
+    """
+    directory = shared_directory() / f"{name}-{dataset_version(frame)}"
+    if not (directory / _META_FILE).exists():
+        write_shared_frame(frame, directory)
+        _prune_versions(name, directory)
+    return directory
+
+
+def share_frame(frame: pd.DataFrame, name: str) -> pd.DataFrame:
+    """
+    Publish `frame` and return the memory-mapped, read-only view. Later calls
+    with the same content, from any process, reuse the existing files.
+    """
+    return open_shared_frame(publish_frame(frame, name))
+
+
+# ---------------- CACHED LOADERS ----------------
+@st.cache_resource(show_spinner=True)
+def load_shared_time_indexed_data(csv_file_path: Path) -> pd.DataFrame:
+    """
+    read_time_indexed_csv() as one read-only frame shared by all sessions
+    (st.cache_data would give each caller its own copy). Do not modify it in place.
+    """
+    return share_frame(read_time_indexed_csv(csv_file_path), Path(csv_file_path).stem)
@@ -0,0 +1,368 @@
+# utils/weather_production.py
+"""
+Relate hourly weather (open-meteo) to hourly Elhub production.
+
+Both sources are aligned on a shared UTC hourly index with an as-of join,
+then weather variables are correlated with production groups over a range
+of lags, either on the whole series or on sliding windows. All window and
+lag computations are vectorized (FFT / cumulative sums), never looped.
+
+Weather and production must cover the same period: the app's
+open-meteo-subset.csv is 2020 and the Elhub collection is 2021, so they can
+only be related once weather for the production year is downloaded. The
+correlator checks this when it is built. The CSV has no location column, so
+WeatherProductionCorrelator.from_weather_csv() takes the location (or price
+area) it was measured for.
+"""
+from __future__ import annotations
+
+from collections import OrderedDict
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from utils.common import read_time_indexed_csv
+
+# ---------------- LOCATION MAPPING ----------------
+# One representative city per Norwegian price area.
+WEATHER_LOCATION_TO_PRICE_AREA: dict[str, str] = {
+    "Oslo": "NO1",
+    "Kristiansand": "NO2",
+    "Trondheim": "NO3",
+    "Tromsø": "NO4",
+    "Bergen": "NO5",
+}
+
+DEFAULT_MAX_LAG_HOURS = 48
+DEFAULT_MAX_RESULT_BYTES = 128 * 2**20
+
+
+def price_area_for_location(location: str, location_to_area: dict[str, str] | None = None) -> str:
+    """Return the price area (NO1–NO5) a weather location belongs to."""
+    mapping = location_to_area or WEATHER_LOCATION_TO_PRICE_AREA
+    if location not in mapping:
+        raise KeyError(f"No price area known for weather location '{location}'.")
+    return mapping[location]
+
+
+# ---------------- ALIGNMENT ----------------
+def build_hourly_production_frame(production: pd.DataFrame, area: str) -> pd.DataFrame:
+    """
+    Turn long Elhub rows (price_area, production_group, start_time, quantity_kwh)
+    into one column per production group on a sorted UTC hourly index.
+    """
+    rows = production[production["price_area"] == area]
+    hourly = (
+        rows
+        .groupby(["start_time", "production_group"])["quantity_kwh"]
+        .sum()
+        .unstack("production_group")
+        .sort_index()
+    )
+    hourly.index = pd.DatetimeIndex(hourly.index).tz_convert("UTC").floor("h")
+    hourly.columns.name = None
+    return hourly
+
+
+def align_weather_and_production(
+    weather: pd.DataFrame,
+    production_hourly: pd.DataFrame,
+    tolerance: str = "30min",
+) -> pd.DataFrame:
+    """
+    As-of join of weather onto the production hours (nearest timestamp within
+    `tolerance`). Both inputs are time-indexed; the result keeps the production
+    index and has production and weather columns side by side.
+    Hours without a close enough weather sample get NaN weather values;
+    raises ValueError when no production hour gets any weather sample (the
+    two sources do not overlap in time).
+    """
+    weather = weather.copy()
+    weather.index = pd.DatetimeIndex(weather.index).tz_convert("UTC")
+    weather = weather.sort_index().select_dtypes(include="number")
+
+    left = production_hourly.sort_index()
+    left.index.name = "time"
+    weather.index.name = "time"
+    weather.index = weather.index.astype(left.index.dtype)
+
+    aligned = pd.merge_asof(
+        left,
+        weather,
+        left_index=True,
+        right_index=True,
+        direction="nearest",
+        tolerance=pd.Timedelta(tolerance),
+    )
+    if len(left) and len(weather.columns) and not aligned[weather.columns].notna().any(axis=None):
+        raise ValueError(
+            "Weather and production do not overlap in time: production covers "
+            f"{left.index.min()} – {left.index.max()}, weather covers "
+            f"{weather.index.min()} – {weather.index.max()}."
+        )
+    return aligned
+
+
+# ---------------- VECTORIZED CORRELATION ----------------
+def _standardize(values: np.ndarray) -> np.ndarray:
+    """Center and scale ignoring NaN (keeps cumulative sums well conditioned)."""
+    values = np.asarray(values, dtype=float)
+    finite = np.isfinite(values)
+    if not finite.any():
+        return values
+    mean = values[finite].mean()
+    std = values[finite].std()
+    return (values - mean) / (std if std > 0 else 1.0)
+
+
+def _pearson_from_sums(n, sx, sy, sxx, syy, sxy, min_periods: int) -> np.ndarray:
+    """Pearson r from pairwise sums; NaN where there are too few pairs or no variance."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = sxy - sx * sy / n
+        var_x = sxx - sx * sx / n
+        var_y = syy - sy * sy / n
+        r = cov / np.sqrt(var_x * var_y)
+    r = np.where((n >= min_periods) & (var_x > 1e-12) & (var_y > 1e-12), r, np.nan)
+    return np.clip(r, -1.0, 1.0)
+
+
+def lagged_correlation(x, y, lags) -> np.ndarray:
+    """
+    Pearson correlation between x[t] and y[t + lag] for every lag, over the
+    whole series. Missing values are handled pairwise. Uses FFT
+    cross-correlation, so the cost is O(n log n) whatever the number of lags.
+    """
+    x = _standardize(x)
+    y = _standardize(y)
+    lags = np.asarray(lags, dtype=int)
+    n = len(x)
+
+    mx = np.isfinite(x).astype(float)
+    my = np.isfinite(y).astype(float)
+    x0 = np.where(mx > 0, x, 0.0)
+    y0 = np.where(my > 0, y, 0.0)
+
+    nfft = 1 << int(np.ceil(np.log2(max(2 * n, 2))))
+
+    def xcorr(a, b):
+        # c[lag] = sum_t a[t] * b[t + lag]
+        full = np.fft.irfft(np.conj(np.fft.rfft(a, nfft)) * np.fft.rfft(b, nfft), nfft)
+        return full[lags % nfft]
+
+    counts = np.rint(xcorr(mx, my))
+    r = _pearson_from_sums(
+        counts,
+        xcorr(x0, my),
+        xcorr(mx, y0),
+        xcorr(x0 * x0, my),
+        xcorr(mx, y0 * y0),
+        xcorr(x0, y0),
+        min_periods=3,
+    )
+    r[np.abs(lags) >= n] = np.nan
+    return r
+
+
+def _shift_matrix(values: np.ndarray, lags: np.ndarray) -> np.ndarray:
+    """Row k holds values[t + lags[k]] (NaN outside the series)."""
+    n = len(values)
+    idx = np.arange(n)[None, :] + lags[:, None]
+    inside = (idx >= 0) & (idx < n)
+    return np.where(inside, values[np.clip(idx, 0, n - 1)], np.nan)
+
+
+def _window_sums(a: np.ndarray, window: int) -> np.ndarray:
+    """Sums over every trailing window along the last axis (cumulative-sum trick)."""
+    c = np.cumsum(a, axis=-1)
+    c = np.concatenate([np.zeros(c.shape[:-1] + (1,)), c], axis=-1)
+    return c[..., window:] - c[..., :-window]
+
+
+def sliding_lagged_correlation(x, y, window: int, lags, min_periods: int | None = None) -> np.ndarray:
+    """
+    Rolling Pearson correlation between x[t] and y[t + lag] for every lag and
+    every trailing window of `window` samples.
+
+    Returns an array of shape (len(lags), len(x)); column t describes the
+    window ending at t and is NaN for the first window - 1 samples.
+    """
+    x = _standardize(x)
+    y = _standardize(y)
+    lags = np.asarray(lags, dtype=int)
+    n = len(x)
+    if window < 2 or window > n:
+        raise ValueError(f"window must be between 2 and {n}, got {window}.")
+    if min_periods is None:
+        min_periods = max(3, window // 2)
+
+    ys = _shift_matrix(y, lags)
+    valid = np.isfinite(x)[None, :] & np.isfinite(ys)
+    xv = np.where(valid, x[None, :], 0.0)
+    yv = np.where(valid, ys, 0.0)
+
+    r = _pearson_from_sums(
+        _window_sums(valid.astype(float), window),
+        _window_sums(xv, window),
+        _window_sums(yv, window),
+        _window_sums(xv * xv, window),
+        _window_sums(yv * yv, window),
+        _window_sums(xv * yv, window),
+        min_periods=min_periods,
+    )
+    out = np.full((len(lags), n), np.nan)
+    out[:, window - 1:] = r
+    return out
+
+
+# ---------------- ENGINE (CACHED) ----------------
+class WeatherProductionCorrelator:
+    """
+    Correlate weather variables with production groups per price area.
+
+    - production: long Elhub frame (price_area, production_group, start_time, quantity_kwh)
+    - weather_by_location: {location name: time-indexed weather frame}
+    - location_to_area: location → price area (defaults to WEATHER_LOCATION_TO_PRICE_AREA)
+
+    Aligned frames and correlation results are cached in memory, keyed by
+    area and by (area, group, variable, window) respectively. Results are an
+    LRU cache of at most `max_results` entries and `max_result_bytes` bytes
+    (a windowed result over a year at ±48 h lags is ~7 MB).
+    Lags are in hours; a positive lag means weather leads production.
+    """
+
+    def __init__(
+        self,
+        production: pd.DataFrame,
+        weather_by_location: dict[str, pd.DataFrame],
+        location_to_area: dict[str, str] | None = None,
+        max_lag: int = DEFAULT_MAX_LAG_HOURS,
+        max_results: int = 256,
+        max_result_bytes: int = DEFAULT_MAX_RESULT_BYTES,
+    ):
+        self.production = production
+        self.location_to_area = location_to_area or WEATHER_LOCATION_TO_PRICE_AREA
+        self.weather_by_area = {
+            price_area_for_location(loc, self.location_to_area): frame
+            for loc, frame in weather_by_location.items()
+        }
+        self.lags = np.arange(-max_lag, max_lag + 1)
+        self._aligned: dict[str, pd.DataFrame] = {}
+        self.max_results = max_results
+        self.max_result_bytes = max_result_bytes
+        self._results: OrderedDict[tuple, tuple[pd.Series | pd.DataFrame, int]] = OrderedDict()
+        self._result_bytes = 0
+        self._check_overlap()
+
+    @classmethod
+    def from_weather_csv(
+        cls,
+        csv_file_path: Path,
+        production: pd.DataFrame,
+        location: str | None = None,
+        area: str | None = None,
+        **kwargs,
+    ) -> "WeatherProductionCorrelator":
+        """
+        Correlator for one weather CSV of the app (read_time_indexed_csv) and
+        the cleaned Elhub frame. The CSV does not say where it was measured:
+        pass the `location` (see WEATHER_LOCATION_TO_PRICE_AREA) or the price `area`.
+        """
+        if (location is None) == (area is None):
+            raise ValueError("Give exactly one of location or area for the weather CSV.")
+        weather = read_time_indexed_csv(csv_file_path)
+        if area is not None:
+            location = Path(csv_file_path).stem
+            kwargs["location_to_area"] = {location: area}
+        return cls(production, {location: weather}, **kwargs)
+
+    def _check_overlap(self) -> None:
+        """Raise ValueError when an area's weather and production periods do not overlap."""
+        produced = (
+            self.production
+            .groupby("price_area", observed=True)["start_time"]
+            .agg(["min", "max"])
+        )
+        disjoint = []
+        for area, weather in self.weather_by_area.items():
+            if area not in produced.index or weather.empty:
+                continue
+            times = pd.DatetimeIndex(weather.index).tz_convert("UTC")
+            first, last = pd.DatetimeIndex(produced.loc[area]).tz_convert("UTC")
+            if times.max() < first or times.min() > last:
+                disjoint.append(
+                    f"{area}: production {first} – {last}, weather {times.min()} – {times.max()}"
+                )
+        if disjoint:
+            raise ValueError(
+                "Weather and production do not overlap in time (weather must cover "
+                "the production year): " + "; ".join(disjoint)
+            )
+
+    def areas(self) -> list[str]:
+        """Price areas that have both weather and production data."""
+        produced = set(self.production["price_area"].unique())
+        return sorted(a for a in self.weather_by_area if a in produced)
+
+    def aligned(self, area: str) -> pd.DataFrame:
+        """Hourly production groups + weather variables for one area."""
+        if area not in self._aligned:
+            if area not in self.weather_by_area:
+                raise KeyError(f"No weather location mapped to price area '{area}'.")
+            hourly = build_hourly_production_frame(self.production, area)
+            self._aligned[area] = align_weather_and_production(self.weather_by_area[area], hourly)
+        return self._aligned[area]
+
+    def correlation(self, area: str, group: str, variable: str, window: int | None = None):
+        """
+        Correlation of `variable` with `group` in `area` for every lag.
+
+        - window=None → pd.Series indexed by lag (whole aligned period)
+        - window=int  → pd.DataFrame indexed by window end time, one column per lag
+        """
+        key = (area, group, variable, window)
+        if key in self._results:
+            self._results.move_to_end(key)
+            return self._results[key][0]
+
+        frame = self.aligned(area)
+        for col in (group, variable):
+            if col not in frame.columns:
+                raise KeyError(f"Column '{col}' not found for price area '{area}'.")
+        x = frame[variable].to_numpy(dtype=float)
+        y = frame[group].to_numpy(dtype=float)
+
+        if window is None:
+            result = pd.Series(lagged_correlation(x, y, self.lags), index=pd.Index(self.lags, name="lag_h"))
+        else:
+            values = sliding_lagged_correlation(x, y, window, self.lags)
+            result = pd.DataFrame(values.T, index=frame.index, columns=pd.Index(self.lags, name="lag_h"))
+
+        self._store(key, result)
+        return result
+
+    def _store(self, key: tuple, result: pd.Series | pd.DataFrame) -> None:
+        """Add to the LRU result cache, evicting the least recently used entries."""
+        size = int(np.sum(result.memory_usage(index=True)))
+        if size > self.max_result_bytes:
+            return
+        self._results[key] = (result, size)
+        self._result_bytes += size
+        while len(self._results) > self.max_results or self._result_bytes > self.max_result_bytes:
+            _, (_, evicted_size) = self._results.popitem(last=False)
+            self._result_bytes -= evicted_size
+
+    def best_lag(self, area: str, group: str, variable: str) -> tuple[int, float]:
+        """Lag (hours) with the strongest absolute correlation, and that correlation."""
+        profile = self.correlation(area, group, variable).dropna()
+        if profile.empty:
+            return 0, float("nan")
+        lag = int(profile.abs().idxmax())
+        return lag, float(profile.loc[lag])
+
+    def clear_cache(self) -> None:
+        """Forget aligned frames and computed correlations."""
+        self._aligned.clear()
+        self._results.clear()
+        self._result_bytes = 0